@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def reserve(buf, n):
+    # Bộ đệm gấp đôi sức chứa: chỉ cấp phát lại khi n vượt quá len(buf)
+    if n <= len(buf):
+        return buf
+    out = np.zeros((max(n, 2 * len(buf)),) + buf.shape[1:], dtype=buf.dtype)
+    out[:len(buf)] = buf
+    return out
+
+
+# ================= DECAY QUEUE =================
+# Thời điểm phân rã của từng hạt nhân được bốc một lần rồi sắp xếp.
+# Mỗi nhịp chỉ cần searchsorted để dời con trỏ: các hạt nằm giữa con trỏ
+# cũ và mới là đúng những hạt vừa phân rã → chi phí theo số phân rã,
+# không theo kích thước mẫu. Số còn lại đếm lùi, không cần quét mảng.
+
+class DecayQueue:
+    def __init__(self, decay_time):
+        self.order = np.argsort(decay_time, kind="stable")
+        self.times = decay_time[self.order]
+        self.cursor = 0
+        self.n = len(decay_time)
+        self.alive = self.n
+
+    def advance(self, t):
+        # Chỉ số các hạt có thời điểm phân rã ≤ t mà chưa lấy ra
+        end = int(np.searchsorted(self.times, t, side="right"))
+        idx = self.order[self.cursor:end]
+        self.cursor = max(self.cursor, end)
+        self.alive = self.n - self.cursor
+        return idx
+
+    def resize(self, n, new_times=()):
+        # Bỏ các hạt chỉ số ≥ n, hoặc thêm hạt n_cũ… với thời điểm new_times
+        # (đều sau thời điểm hiện tại → chèn vào phần chưa phân rã)
+        if n < self.n:
+            keep = self.order < n
+            self.cursor = int(np.count_nonzero(keep[:self.cursor]))
+            self.order = self.order[keep]
+            self.times = self.times[keep]
+        elif len(new_times):
+            k = np.argsort(new_times, kind="stable")
+            at = np.searchsorted(self.times, new_times[k], side="right")
+            self.order = np.insert(self.order, at, self.n + k)
+            self.times = np.insert(self.times, at, new_times[k])
+        self.n = len(self.order)
+        self.alive = self.n - self.cursor
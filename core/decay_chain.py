@@ -0,0 +1,337 @@
+import numpy as np
+
+from core.decay import reserve
+
+
+# ================= DECAY CHAINS =================
+# Mỗi nuclide: (tên, chu kỳ bán rã, kiểu phân rã, [(con, tỉ lệ nhánh)]).
+# Chu kỳ None = bền (hoặc sống quá lâu so với thang mô phỏng).
+
+CHAINS = {
+    "rn222": {
+        "name": "Rn-222 (đơn vị: giờ)",
+        "nuclides": [
+            ("Rn-222", 91.8, "alpha", [("Po-218", 1.0)]),
+            ("Po-218", 0.0517, "alpha", [("Pb-214", 1.0)]),
+            ("Pb-214", 0.447, "beta", [("Bi-214", 1.0)]),
+            ("Bi-214", 0.332, "beta", [("Po-214", 1.0)]),
+            ("Po-214", 4.6e-8, "alpha", [("Pb-210", 1.0)]),
+            # Pb-210: 22 năm ≫ thang giờ → coi như bền
+            ("Pb-210", None, "stable", []),
+        ],
+    },
+    "bi212": {
+        "name": "Bi-212 rẽ nhánh (đơn vị: phút)",
+        "nuclides": [
+            ("Bi-212", 60.55, "beta", [("Po-212", 0.6406), ("Tl-208", 0.3594)]),
+            ("Po-212", 5.0e-9, "alpha", [("Pb-208", 1.0)]),
+            ("Tl-208", 3.053, "beta", [("Pb-208", 1.0)]),
+            ("Pb-208", None, "stable", []),
+        ],
+    },
+    "u238": {
+        # Chu kỳ thật trải từ µs tới tỉ năm → thang nén để thấy cả chuỗi
+        "name": "U-238 rút gọn (thang nén)",
+        "nuclides": [
+            ("U-238", 50.0, "alpha", [("Th-234", 1.0)]),
+            ("Th-234", 2.0, "beta", [("Pa-234", 1.0)]),
+            ("Pa-234", 0.5, "beta", [("U-234", 1.0)]),
+            ("U-234", 20.0, "alpha", [("Th-230", 1.0)]),
+            ("Th-230", 10.0, "alpha", [("Ra-226", 1.0)]),
+            ("Ra-226", 5.0, "alpha", [("Pb-206", 1.0)]),
+            ("Pb-206", None, "stable", []),
+        ],
+    },
+}
+
+MODES = ("alpha", "beta", "gamma", "stable")
+
+
+def chain_nuclides(key, lam=None):
+    # key None = một loại hạt nhân với hằng số phân rã lam, con bền
+    if key is None:
+        return [
+            ("Mẹ", np.log(2) / lam, "alpha", [("Con", 1.0)]),
+            ("Con", None, "stable", []),
+        ]
+    return CHAINS[key]["nuclides"]
+
+
+def chain_tables(nuclides):
+    # Bảng tra theo mã loại (int8): λ, kiểu phân rã, con và tỉ lệ tích lũy.
+    # Con luôn đứng sau mẹ trong danh sách → mã loại chỉ tăng theo thời gian
+    names = [n[0] for n in nuclides]
+    S = len(names)
+    K = max(len(n[3]) for n in nuclides) or 1
+
+    lam = np.zeros(S)
+    mode = np.zeros(S, dtype=np.int8)
+    daughter = np.zeros((S, K), dtype=np.int8)
+    cum = np.ones((S, K))
+
+    for s, (_, half_life, kind, children) in enumerate(nuclides):
+        lam[s] = 0.0 if half_life is None else np.log(2) / half_life
+        mode[s] = MODES.index(kind)
+        daughter[s] = s
+        if children:
+            ratios = np.array([r for _, r in children])
+            daughter[s, :len(children)] = [names.index(c) for c, _ in children]
+            daughter[s, len(children):] = daughter[s, len(children) - 1]
+            cum[s, :len(children)] = np.cumsum(ratios / ratios.sum())
+
+    return names, lam, mode, daughter, cum
+
+
+# ================= STOCHASTIC ENGINE =================
+# Mỗi hạt nhân giữ mã loại (int8) và thời điểm chuyển tiếp kế tiếp.
+# Mỗi nhịp: lấy các hạt đã tới hạn, bốc con theo tỉ lệ nhánh cho cả lô,
+# bốc thời điểm mới theo λ của con; lặp trên đúng các hạt vừa đổi
+# (con sống rất ngắn có thể phân rã tiếp ngay trong cùng nhịp).
+
+class DecayChain:
+    def __init__(self, nuclides, n, seed=None):
+        self.names, self.lam, self.mode, self.daughter, self.cum = chain_tables(nuclides)
+        self.rng = np.random.default_rng(seed)
+
+        # species / next_time là view n phần tử đầu của bộ đệm có dự trữ
+        self.species_buf = np.zeros(n, dtype=np.int8)
+        self.time_buf = self.sample_times(self.species_buf, 0.0)
+        self.species = self.species_buf
+        self.next_time = self.time_buf
+        self.counts = np.zeros(len(self.names), dtype=np.int64)
+        self.counts[0] = n
+        self.last_decays = np.zeros(len(self.names), dtype=np.int64)
+
+    @property
+    def n(self):
+        return len(self.species)
+
+    @property
+    def n_species(self):
+        return len(self.names)
+
+    def sample_times(self, species, t0):
+        lam = self.lam[species]
+        u = self.rng.exponential(size=len(species))
+        with np.errstate(divide="ignore"):
+            return t0 + np.where(lam > 0, u / lam, np.inf)
+
+    def resize(self, n, t):
+        # Bỏ các hạt chỉ số ≥ n, hoặc thêm hạt mẹ mới sinh tại thời điểm t;
+        # các hạt còn lại giữ nguyên loại và thời điểm chuyển tiếp
+        old = self.n
+        if n < old:
+            self.counts -= np.bincount(self.species[n:], minlength=self.n_species)
+        elif n > old:
+            self.species_buf = reserve(self.species_buf, n)
+            self.time_buf = reserve(self.time_buf, n)
+            self.species_buf[old:n] = 0
+            self.time_buf[old:n] = self.sample_times(self.species_buf[old:n], t)
+            self.counts[0] += n - old
+        self.species = self.species_buf[:n]
+        self.next_time = self.time_buf[:n]
+
+    def advance(self, t):
+        # Trả về (chỉ số, mẹ, con) của mọi chuyển tiếp tới thời điểm t
+        due = np.flatnonzero(self.next_time <= t)
+        events = []
+
+        while len(due):
+            parent = self.species[due]
+            r = self.rng.random(len(due))
+            k = np.sum(r[:, None] > self.cum[parent], axis=1)
+            child = self.daughter[parent, k]
+
+            self.species[due] = child
+            self.next_time[due] = self.sample_times(child, self.next_time[due])
+            self.counts -= np.bincount(parent, minlength=self.n_species)
+            self.counts += np.bincount(child, minlength=self.n_species)
+            events.append((due, parent, child))
+
+            due = due[self.next_time[due] <= t]
+
+        if not events:
+            self.last_decays[:] = 0
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.astype(np.int8), empty.astype(np.int8)
+
+        idx, parent, child = (np.concatenate(a) for a in zip(*events))
+        self.last_decays = np.bincount(parent, minlength=self.n_species)
+        return idx, parent, child
+
+    def emissions(self):
+        return count_emissions(self.mode, self.last_decays)
+
+
+def count_emissions(mode, decays):
+    # Số hạt α, β phát ra ứng với số phân rã của từng loại
+    return int(np.sum(decays[mode == 0])), int(np.sum(decays[mode == 1]))
+
+
+# ================= AGGREGATE ENGINE =================
+# Quần thể 10^6–10^8 hạt chỉ lưu số hạt mỗi loại. Hạt chọn nhánh độc lập với
+# thời điểm phân rã → chia quần thể ngay từ đầu theo từng đường mẹ → bền
+# (Multinomial theo tích tỉ lệ nhánh), mỗi đường là một chuỗi thẳng. Mỗi
+# nhịp, theo thứ tự đường: số phân rã ~ Binomial(N, 1 - e^(-λ dt)) sang nấc
+# sau. Hạt vừa sinh ra trong nhịp (thời điểm sinh coi như đều trên [0, dt])
+# phân rã tiếp với xác suất 1 - (1 - e^(-λ dt)) / (λ dt).
+#
+# Chỉ vẽ một tập con cố định n_shown điểm: điểm có hạng r (hoán vị ngẫu
+# nhiên cố định) mang nấc k khi r rơi vào khoảng tích lũy thứ k của các nấc
+# xếp nối theo đường. Tổng mỗi đường không đổi → điểm ở yên trong khoảng của
+# đường mình và chỉ đi xuôi đường đó, kể cả ở chuỗi rẽ nhánh.
+
+def chain_paths(lam, daughter, cum):
+    # Mọi đường từ mẹ (mã 0) tới hạt bền, kèm xác suất đi theo đường đó
+    ratios = np.diff(np.concatenate([np.zeros((len(lam), 1)), cum], axis=1), axis=1)
+    paths, stack = [], [([0], 1.0)]
+    while stack:
+        path, w = stack.pop()
+        s = path[-1]
+        if lam[s] == 0:
+            paths.append((path, w))
+            continue
+        for c, r in reversed(list(zip(daughter[s], ratios[s]))):
+            if r > 0:
+                stack.append((path + [int(c)], w * r))
+    return paths
+
+
+class AggregateDecay:
+    def __init__(self, nuclides, n_total, n_shown=2000, seed=None):
+        self.names, self.lam, self.mode, self.daughter, self.cum = chain_tables(nuclides)
+        self.rng = np.random.default_rng(seed)
+        S = len(self.names)
+
+        # Các nấc của mọi đường xếp nối nhau; nấc cuối mỗi đường là hạt bền
+        paths = chain_paths(self.lam, self.daughter, self.cum)
+        self.step_species = np.concatenate([path for path, _ in paths]).astype(np.int8)
+        first = np.cumsum([0] + [len(path) for path, _ in paths[:-1]])
+
+        self.n = int(n_total)
+        self.steps = np.zeros(len(self.step_species), dtype=np.int64)
+        self.steps[first] = self.rng.multinomial(self.n, [w for _, w in paths])
+        self.counts = np.zeros(S, dtype=np.int64)
+        self.last_decays = np.zeros(S, dtype=np.int64)
+        self.sum_counts()
+
+        self.rank = self.rng.permutation(n_shown)
+        self.species = self.step_species[self.shown_steps()]
+
+    @property
+    def n_species(self):
+        return len(self.names)
+
+    def sum_counts(self):
+        self.counts[:] = 0
+        np.add.at(self.counts, self.step_species, self.steps)
+
+    def shown_steps(self):
+        bounds = np.round(np.cumsum(self.steps) / self.n * len(self.rank))
+        return np.searchsorted(bounds, self.rank, side="right")
+
+    def advance(self, dt):
+        # Trả về chỉ số các điểm hiển thị vừa đổi loại
+        x = self.lam * dt
+        p = -np.expm1(-x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            q = np.where(x > 0, 1 - p / x, 0.0)
+        old = self.steps.copy()
+        arrived = np.zeros_like(self.steps)
+        self.last_decays[:] = 0
+
+        for f, s in enumerate(self.step_species):
+            if self.lam[s] == 0:
+                continue
+            k = self.rng.binomial(old[f], p[s]) + self.rng.binomial(arrived[f], q[s])
+            if k == 0:
+                continue
+            self.steps[f] -= k
+            self.steps[f + 1] += k
+            arrived[f + 1] += k
+            self.last_decays[s] += k
+        self.sum_counts()
+
+        species = self.step_species[self.shown_steps()]
+        changed = np.flatnonzero(species != self.species)
+        self.species = species
+        return changed
+
+    def emissions(self):
+        return count_emissions(self.mode, self.last_decays)
+
+
+# ================= BATEMAN =================
+# dN/dt = A N, A_ss = -λ_s, A_cs = tỉ lệ nhánh(s → c) λ_s
+# → N(t) = exp(A t) N(0), giải chính xác mọi chuỗi rẽ nhánh.
+
+def bateman_matrix(nuclides):
+    names, lam, _, daughter, cum = chain_tables(nuclides)
+    S = len(names)
+    A = np.zeros((S, S))
+    for s in range(S):
+        if lam[s] == 0:
+            continue
+        A[s, s] -= lam[s]
+        ratios = np.diff(np.concatenate([[0.0], cum[s]]))
+        for c, r in zip(daughter[s], ratios):
+            A[c, s] += r * lam[s]
+    return A
+
+
+def expm(M):
+    # Bình phương-thu nhỏ + chuỗi Taylor, đủ cho ma trận nhỏ vài chục phần tử
+    norm = np.max(np.sum(np.abs(M), axis=1))
+    k = max(0, int(np.ceil(np.log2(norm))) + 1) if norm > 0 else 0
+    X = M / 2**k
+    E = np.eye(len(M))
+    term = np.eye(len(M))
+    for j in range(1, 18):
+        term = term @ X / j
+        E = E + term
+    for _ in range(k):
+        E = E @ E
+    return E
+
+
+def bateman(nuclides, n0, t):
+    # Số hạt mỗi loại tại các thời điểm t (mẫu ban đầu toàn nuclide mẹ)
+    A = bateman_matrix(nuclides)
+    N0 = np.zeros(len(A))
+    N0[0] = n0
+    return np.array([expm(A * ti) @ N0 for ti in np.atleast_1d(t)])
+
+
+class BatemanCohorts:
+    # Đường Bateman cho mẫu thêm/bớt hạt giữa chừng. Mỗi nhóm (đầu, cuối, f, t)
+    # là các hạt chỉ số [đầu, cuối) sinh cùng lúc t, f = tỉ lệ từng loại của
+    # nhóm, cùng lan truyền f ← exp(A dt) f. Bớt hạt = cắt đúng các nhóm
+    # chứa chỉ số bị bỏ (hạt trong một nhóm hoán đổi được cho nhau).
+
+    def __init__(self, A, n):
+        self.A = A
+        self.t = 0.0
+        self.fresh = np.zeros(len(A))
+        self.fresh[0] = 1.0
+        self.cohorts = [[0, n, self.fresh.copy(), self.t]]
+
+    def advance(self, dt):
+        P = expm(self.A * dt)
+        for c in self.cohorts:
+            c[2] = P @ c[2]
+        self.t += dt
+
+    def resize(self, n):
+        old = self.cohorts[-1][1]
+        if n < old:
+            self.cohorts = [[a, min(b, n), f, t] for a, b, f, t in self.cohorts if a < n]
+        elif n > old:
+            last = self.cohorts[-1]
+            if last[3] == self.t:
+                # Nhóm cuối sinh cùng nhịp (nhiều lần đổi N giữa hai advance) → gộp
+                last[1] = n
+            else:
+                self.cohorts.append([old, n, self.fresh.copy(), self.t])
+
+    def expected(self):
+        return sum((b - a) * f for a, b, f, _ in self.cohorts)
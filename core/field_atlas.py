@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.field_model import build_scene
+from core.field_tracer import SEED_POOL, StreamTracer, seed_points
+
+
+# ================= FIELD-LINE ATLAS =================
+# Dựng sẵn (offline) bộ đường sức cho mọi nấc thanh trượt chiều dài × khe hở,
+# ghi vào một file duy nhất, lúc chạy chỉ memory-map và cắt lát → vài ms.
+# File atlas không nằm trong git (.gitignore), dựng bằng:
+#   python -m core.field_atlas --scenes bar
+# Thiếu hoặc hỏng atlas thì MagneticSim vết đường sức trực tiếp như cũ.
+#
+# [header 4 KB: magic + JSON] rồi các mảng nối tiếp:
+#   entry_key   (E, 3)  f8   cấu hình, chiều dài, khe hở
+#   entry_line  (E + 1) i8   đường [entry_line[e], entry_line[e + 1]) thuộc mục e
+#   line_start  (L + 1) i8   điểm [line_start[l], line_start[l + 1]) thuộc đường l
+#   line_seed   (L,)    i4   chỉ số hạt giống, tăng dần trong mỗi mục
+#   points      (P, 3)  f4
+#   logB        (P,)    f4   log10 |B| với cường độ đơn vị
+
+MAGIC = b"STEMATL1"
+HEADER_SIZE = 4096
+ATLAS_PATH = "data/field_atlas.bin"
+
+LENGTHS = [v / 10 for v in range(5, 21)]
+GAPS = [v / 100 for v in range(1, 21)]
+
+# Cùng ngưỡng dừng với đường vết trực tiếp (TERMINAL_SPEED / B_REF)
+TERMINAL = 5e-3
+
+
+def write_header(f, meta):
+    blob = json.dumps(meta).encode("utf-8")
+    if len(MAGIC) + len(blob) > HEADER_SIZE:
+        raise ValueError("Header quá lớn")
+    f.seek(0)
+    f.write(MAGIC + blob.ljust(HEADER_SIZE - len(MAGIC), b" "))
+
+
+def read_header(f):
+    f.seek(0)
+    raw = f.read(HEADER_SIZE)
+    if not raw.startswith(MAGIC):
+        raise ValueError("Không phải file atlas đường sức")
+    return json.loads(raw[len(MAGIC):].decode("utf-8"))
+
+
+# ================= BUILD =================
+
+def trace_entry(args):
+    scene, length, gap, pool = args
+    sources = build_scene(scene, length, gap)
+    tracer = StreamTracer(sources, terminal=TERMINAL)
+    points, B, lengths, seeds = tracer.trace(seed_points(sources, pool, pool))
+    logB = np.log10(np.linalg.norm(B, axis=1) + 1e-12).astype(np.float32)
+    return points, logB, lengths, seeds
+
+
+def build_atlas(path, scenes=("bar",), lengths=LENGTHS, gaps=GAPS, pool=SEED_POOL, workers=None):
+    keys = list(itertools.product(scenes, lengths, gaps))
+    workers = workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool_exec:
+        results = list(pool_exec.map(trace_entry, [(*k, pool) for k in keys], chunksize=1))
+
+    entry_key = np.array([(scenes.index(s), L, g) for s, L, g in keys], dtype="<f8")
+    n_lines = [len(r[2]) for r in results]
+    entry_line = np.concatenate([[0], np.cumsum(n_lines)]).astype("<i8")
+    all_lengths = np.concatenate([r[2] for r in results])
+    line_start = np.concatenate([[0], np.cumsum(all_lengths)]).astype("<i8")
+
+    arrays = {
+        "entry_key": entry_key,
+        "entry_line": entry_line,
+        "line_start": line_start,
+        "line_seed": np.concatenate([r[3] for r in results]).astype("<i4"),
+        "points": np.concatenate([r[0] for r in results]).astype("<f4"),
+        "logB": np.concatenate([r[1] for r in results]).astype("<f4"),
+    }
+
+    meta = {"scenes": list(scenes), "pool": pool, "terminal": TERMINAL, "arrays": {}}
+    offset = HEADER_SIZE
+    for name, a in arrays.items():
+        meta["arrays"][name] = {"offset": offset, "dtype": a.dtype.str, "shape": a.shape}
+        offset += a.nbytes
+
+    with open(path, "wb") as f:
+        write_header(f, meta)
+        for a in arrays.values():
+            f.write(a.tobytes())
+
+    return len(keys), int(entry_line[-1]), len(arrays["points"])
+
+
+# ================= RUNTIME =================
+
+class FieldAtlas:
+    def __init__(self, path=ATLAS_PATH):
+        with open(path, "rb") as f:
+            self.meta = read_header(f)
+
+        self.scenes = self.meta["scenes"]
+        self.pool = self.meta["pool"]
+        for name, spec in self.meta["arrays"].items():
+            a = np.memmap(
+                path, dtype=spec["dtype"], mode="r",
+                offset=spec["offset"], shape=tuple(spec["shape"])
+            )
+            setattr(self, name, a)
+
+        self.keys = np.array(self.entry_key)
+
+    def lookup(self, scene, length, gap):
+        # Mục gần nhất theo số nấc thanh trượt: (chỉ số, trùng khớp?) hoặc None
+        if scene not in self.scenes:
+            return None
+        same = np.flatnonzero(self.keys[:, 0] == self.scenes.index(scene))
+        if not len(same):
+            return None
+
+        d = (
+            np.abs(self.keys[same, 1] - length) / 0.1
+            + np.abs(self.keys[same, 2] - gap) / 0.01
+        )
+        k = int(np.argmin(d))
+        return int(same[k]), bool(d[k] < 1e-6)
+
+    def lines(self, entry, count):
+        # n đường đầu = các đường có hạt giống < n: là một lát liên tục
+        a, b = self.entry_line[entry], self.entry_line[entry + 1]
+        if count > self.pool:
+            return None
+        m = a + int(np.searchsorted(self.line_seed[a:b], count))
+
+        p0, p1 = self.line_start[a], self.line_start[m]
+        lengths = np.diff(self.line_start[a:m + 1])
+        return self.points[p0:p1], self.logB[p0:p1], lengths
+
+    def close(self):
+        for name in self.meta["arrays"]:
+            delattr(self, name)
+
+
+def load_atlas(path=ATLAS_PATH):
+    # Không có atlas (chưa dựng) hoặc file hỏng / cắt cụt / khác định dạng
+    # → tính trực tiếp như cũ
+    if not os.path.exists(path):
+        return None
+    try:
+        return FieldAtlas(path)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _names(text):
+    return text.split(",")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dựng sẵn atlas đường sức từ")
+    parser.add_argument("--scenes", type=_names, default=["bar"])
+    parser.add_argument("--pool", type=int, default=SEED_POOL)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=ATLAS_PATH)
+    args = parser.parse_args()
+
+    n_entries, n_lines, n_points = build_atlas(
+        args.out, scenes=args.scenes, pool=args.pool, workers=args.workers
+    )
+    size = os.path.getsize(args.out) / 1024**2
+    print(f"Đã ghi {n_entries} mục, {n_lines} đường, {n_points} điểm ({size:.1f} MB) vào {args.out}")
@@ -0,0 +1,178 @@
+import numpy as np
+
+
+# ================= FIELD MODEL =================
+
+def dipole_field(r, m):
+    r_mag = np.linalg.norm(r, axis=1)[:, None] + 1e-4
+    r_hat = r / r_mag
+    dot = np.sum(m * r_hat, axis=1)[:, None]
+    return (3 * dot * r_hat - m) / (r_mag ** 3)
+
+
+# ================= SOURCES =================
+# Trường = chồng chập nhiều nguồn rời rạc, cùng thang với dipole_field:
+#   - từ tích điểm q        (mặt cực của nam châm thẳng)
+#   - lưỡng cực điểm m
+#   - đoạn dòng điện a → b  (vòng dây, ống dây; Biot–Savart)
+# Tính theo từng khối điểm lưới để bộ nhớ tạm không vượt ngân sách
+# (khối nhỏ, vài MB, còn nằm gọn trong cache CPU nên lại nhanh hơn).
+
+SOFTEN = 1e-2
+
+
+class FieldSources:
+    def __init__(self):
+        self.charge_pos = np.zeros((0, 3))
+        self.charge_q = np.zeros(0)
+        self.dipole_pos = np.zeros((0, 3))
+        self.dipole_m = np.zeros((0, 3))
+        self.seg_a = np.zeros((0, 3))
+        self.seg_b = np.zeros((0, 3))
+        self.seg_I = np.zeros(0)
+        # Hình vẽ: (bounds hộp, màu) cho nam châm, polyline cho dây
+        self.boxes = []
+        self.wires = []
+
+    @property
+    def n_sources(self):
+        return len(self.charge_q) + len(self.dipole_m) + len(self.seg_I)
+
+    def extent(self):
+        # Bán kính nhỏ nhất bao hết các nguồn quanh gốc tọa độ
+        pts = np.vstack([self.charge_pos, self.dipole_pos, self.seg_a, self.seg_b])
+        return float(np.max(np.linalg.norm(pts, axis=1))) if len(pts) else 0.0
+
+    # ---- BUILDERS ----
+
+    def add_charges(self, pos, q):
+        self.charge_pos = np.vstack([self.charge_pos, pos])
+        self.charge_q = np.concatenate([self.charge_q, q])
+
+    def add_dipole(self, pos, m):
+        self.dipole_pos = np.vstack([self.dipole_pos, [pos]])
+        self.dipole_m = np.vstack([self.dipole_m, [m]])
+
+    def add_bar_magnet(self, y0, y1, moment=1.0, width=0.6, k=6):
+        # Nam châm thẳng dọc trục y, từ hóa đều: mặt cực y1 mang +q,
+        # mặt y0 mang -q, mỗi mặt chia k×k từ tích điểm.
+        # moment > 0 → cực N ở y1
+        length = abs(y1 - y0)
+        u = (np.arange(k) + 0.5) / k * width - width / 2
+        gx, gz = [a.ravel() for a in np.meshgrid(u, u)]
+        q = np.full(k * k, moment / length / (k * k))
+
+        for y, sign in ((y1, 1), (y0, -1)):
+            face = np.column_stack([gx, np.full(k * k, y), gz])
+            self.add_charges(face, sign * q)
+
+        w = width / 2
+        n_end, s_end = (y1, y0) if moment > 0 else (y0, y1)
+        mid = (y0 + y1) / 2
+        self.boxes.append(((-w, w, min(mid, n_end), max(mid, n_end), -w, w), "#ff3b3b"))
+        self.boxes.append(((-w, w, min(mid, s_end), max(mid, s_end), -w, w), "#3b6cff"))
+
+    def add_coil(self, y0, y1, radius=0.5, turns=10, current=1.0, per_turn=16):
+        # Ống dây xoắn dọc trục y, rời rạc thành các đoạn thẳng
+        t = np.linspace(0, 2 * np.pi * turns, turns * per_turn + 1)
+        pts = np.column_stack([
+            radius * np.sin(t),
+            np.linspace(y0, y1, len(t)),
+            radius * np.cos(t),
+        ])
+        self.seg_a = np.vstack([self.seg_a, pts[:-1]])
+        self.seg_b = np.vstack([self.seg_b, pts[1:]])
+        self.seg_I = np.concatenate([self.seg_I, np.full(len(pts) - 1, current)])
+        self.wires.append(pts)
+
+    # ---- EVALUATION ----
+
+    def field(self, pts, strength=1.0, budget_bytes=4 * 1024**2, cancelled=None):
+        B = np.zeros((len(pts), 3))
+        # ~12 mảng tạm (P, S) float64 mỗi khối
+        per_point = max(self.n_sources, 1) * 8 * 12
+        chunk = max(1, budget_bytes // per_point)
+
+        for k in range(0, len(pts), chunk):
+            if cancelled is not None and cancelled():
+                return None
+            p = pts[k:k + chunk]
+            B[k:k + chunk] = self.field_chunk(p)
+
+        B *= strength
+        return B
+
+    def field_chunk(self, p):
+        # Tách thành từng thành phần (P, S): nhanh hơn cross/norm trên (P, S, 3)
+        B = np.zeros((len(p), 3))
+        x, y, z = p[:, 0, None], p[:, 1, None], p[:, 2, None]
+
+        if len(self.charge_q):
+            c = self.charge_pos
+            dx, dy, dz = x - c[:, 0], y - c[:, 1], z - c[:, 2]
+            r2 = dx * dx + dy * dy + dz * dz + SOFTEN**2
+            w = self.charge_q / (r2 * np.sqrt(r2))
+            B[:, 0] += np.sum(w * dx, axis=1)
+            B[:, 1] += np.sum(w * dy, axis=1)
+            B[:, 2] += np.sum(w * dz, axis=1)
+
+        if len(self.dipole_m):
+            c, m = self.dipole_pos, self.dipole_m
+            dx, dy, dz = x - c[:, 0], y - c[:, 1], z - c[:, 2]
+            r2 = dx * dx + dy * dy + dz * dz + SOFTEN**2
+            inv5 = 1 / (r2 * r2 * np.sqrt(r2))
+            dot3 = 3 * (dx * m[:, 0] + dy * m[:, 1] + dz * m[:, 2]) * inv5
+            inv3 = r2 * inv5
+            B[:, 0] += np.sum(dot3 * dx - inv3 * m[:, 0], axis=1)
+            B[:, 1] += np.sum(dot3 * dy - inv3 * m[:, 1], axis=1)
+            B[:, 2] += np.sum(dot3 * dz - inv3 * m[:, 2], axis=1)
+
+        if len(self.seg_I):
+            # Đoạn thẳng a → b: B = I (L × r1)(|r1| + |r2|) / (|r1||r2|(|r1||r2| + r1·r2))
+            a, L = self.seg_a, self.seg_b - self.seg_a
+            dx, dy, dz = x - a[:, 0], y - a[:, 1], z - a[:, 2]
+            n1 = np.sqrt(dx * dx + dy * dy + dz * dz)
+            ex, ey, ez = dx - L[:, 0], dy - L[:, 1], dz - L[:, 2]
+            n2 = np.sqrt(ex * ex + ey * ey + ez * ez)
+            n12 = n1 * n2
+            w = self.seg_I * (n1 + n2) / (n12 * (n12 + dx * ex + dy * ey + dz * ez) + SOFTEN**2)
+            B[:, 0] += np.sum(w * (L[:, 1] * dz - L[:, 2] * dy), axis=1)
+            B[:, 1] += np.sum(w * (L[:, 2] * dx - L[:, 0] * dz), axis=1)
+            B[:, 2] += np.sum(w * (L[:, 0] * dy - L[:, 1] * dx), axis=1)
+
+        return B
+
+
+# ================= SCENES =================
+
+SCENES = {
+    "bar":    "Nam châm thẳng",
+    "repel":  "Hai nam châm đẩy nhau",
+    "coil":   "Ống dây",
+    "dipole": "Lưỡng cực điểm",
+}
+
+
+def build_scene(scene, length, gap):
+    # Cường độ đơn vị: mô-men tổng ~ 1 như lưỡng cực gốc m = (0, 1, 0)
+    src = FieldSources()
+    L, g = length, gap
+
+    if scene == "bar":
+        # Hai nửa N / S của cùng một thanh, cách nhau khe hở g
+        src.add_bar_magnet(g, g + L, moment=0.5)
+        src.add_bar_magnet(-g - L, -g, moment=0.5)
+        src.boxes = [
+            ((-0.3, 0.3, g, g + L, -0.3, 0.3), "#ff3b3b"),
+            ((-0.3, 0.3, -g - L, -g, -0.3, 0.3), "#3b6cff"),
+        ]
+    elif scene == "repel":
+        # Hai cực N quay vào nhau
+        src.add_bar_magnet(g, g + L, moment=-0.5)
+        src.add_bar_magnet(-g - L, -g, moment=0.5)
+    elif scene == "coil":
+        src.add_coil(-g - L, g + L, radius=0.5, turns=12, current=0.1)
+    else:
+        src.add_dipole((0, 0, 0), (0, 1.0, 0))
+
+    return src
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ================= PROBE =================
+# Chỉ tính trường đúng tại các điểm cần xem, không đụng tới cả khối lưới.
+
+def probe(sources, point, strength=1.0):
+    B = sources.field(np.asarray(point, dtype=float).reshape(1, 3), strength)[0]
+    return B, float(np.linalg.norm(B))
+
+
+# ================= SLICE PLANE =================
+# Mặt cắt r × r điểm quanh origin, vuông góc normal. Kết quả (cường độ đơn vị)
+# lưu theo (hình học, vị trí mặt cắt) → kéo qua lại chỗ cũ không tính lại.
+# Chạy trong FieldWorker: bộ nhớ đệm chỉ do luồng phụ đụng tới.
+
+def plane_basis(normal):
+    n = np.asarray(normal, dtype=float)
+    n = n / (np.linalg.norm(n) + 1e-12)
+    helper = np.array([1.0, 0, 0]) if abs(n[0]) < 0.9 else np.array([0, 1.0, 0])
+    u = np.cross(n, helper)
+    u /= np.linalg.norm(u)
+    v = np.cross(n, u)
+    return n, u, v
+
+
+def plane_faces(res):
+    # Ô vuông (res - 1)² theo định dạng VTK [4, a, b, c, d, ...]
+    k = np.arange(res * res).reshape(res, res)
+    quads = np.column_stack([
+        np.full((res - 1) ** 2, 4),
+        k[:-1, :-1].ravel(), k[:-1, 1:].ravel(),
+        k[1:, 1:].ravel(), k[1:, :-1].ravel(),
+    ])
+    return quads.ravel()
+
+
+class SliceSampler:
+    def __init__(self, resolution=48, size=9.0, max_entries=64):
+        self.resolution = resolution
+        self.size = size
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def plane_points(self, origin, normal):
+        _, u, v = plane_basis(normal)
+        s = np.linspace(-self.size / 2, self.size / 2, self.resolution)
+        a, b = np.meshgrid(s, s, indexing="ij")
+        return (
+            np.asarray(origin, dtype=float)
+            + a.ravel()[:, None] * u
+            + b.ravel()[:, None] * v
+        )
+
+    def __call__(self, params, cancelled):
+        return self.sample(
+            params["sources"], params["geometry"], params["origin"], params["normal"],
+            cancelled,
+        )
+
+    def sample(self, sources, geometry, origin, normal, cancelled=None):
+        # (pts, B, logB), hoặc None nếu bị hủy (không lưu)
+        # Làm tròn vị trí để các lần kéo gần như trùng nhau dùng chung mục
+        key = (
+            geometry,
+            tuple(np.round(origin, 2)),
+            tuple(np.round(plane_basis(normal)[0], 3)),
+        )
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+
+        pts = self.plane_points(key[1], key[2])
+        B = sources.field(pts, cancelled=cancelled)
+        if B is None:
+            return None
+        entry = (pts, B, np.log10(np.linalg.norm(B, axis=1) + 1e-12))
+
+        self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
@@ -0,0 +1,176 @@
+import numpy as np
+
+
+# ================= STREAMLINE TRACER =================
+# Vết đường sức trực tiếp trên trường giải tích (không qua lưới):
+# mọi hạt giống tiến cùng lúc bằng bước Runge–Kutta–Cash–Karp 4(5),
+# mỗi đường tự chỉnh bước theo sai số và tự dừng khi ra khỏi hộp,
+# khi |B| quá yếu, khi đi vào cực (hướng trường quay ngược), khi vòng
+# kín quay lại hạt giống, khi quá dài (đường quấn mãi quanh ống dây)
+# hoặc hết số bước.
+# Tích phân theo độ dài cung: dx/ds = ±B / |B| → bước h chính là độ dài.
+
+# Bảng hệ số Cash–Karp
+A = np.array([
+    [0, 0, 0, 0, 0],
+    [1 / 5, 0, 0, 0, 0],
+    [3 / 40, 9 / 40, 0, 0, 0],
+    [3 / 10, -9 / 10, 6 / 5, 0, 0],
+    [-11 / 54, 5 / 2, -70 / 27, 35 / 27, 0],
+    [1631 / 55296, 175 / 512, 575 / 13824, 44275 / 110592, 253 / 4096],
+])
+C5 = np.array([37 / 378, 0, 250 / 621, 125 / 594, 0, 512 / 1771])
+C4 = np.array([2825 / 27648, 0, 18575 / 48384, 13525 / 55296, 277 / 14336, 1 / 4])
+
+
+def fibonacci_sphere(n, radius=1.0, center=(0, 0, 0)):
+    # Điểm phân bố đều trên mặt cầu
+    k = np.arange(n) + 0.5
+    phi = np.arccos(1 - 2 * k / n)
+    theta = np.pi * (1 + 5 ** 0.5) * k
+    pts = np.column_stack([
+        np.cos(theta) * np.sin(phi),
+        np.cos(phi),
+        np.sin(theta) * np.sin(phi),
+    ])
+    return radius * pts + np.asarray(center, dtype=float)
+
+
+def spread_order(n):
+    # Xếp chỉ số theo nghịch đảo bit (van der Corput): mọi tiền tố của
+    # thứ tự này đều rải đều trên cả mặt cầu
+    bits = max(1, int(np.ceil(np.log2(max(n, 2)))))
+    k = np.arange(n)
+    rev = np.zeros(n, dtype=np.int64)
+    for b in range(bits):
+        rev |= ((k >> b) & 1) << (bits - 1 - b)
+    return np.argsort(rev)
+
+
+# Số hạt giống cố định: n đường bất kỳ = n hạt giống đầu tiên của cùng
+# một tập → bộ đường sức dựng sẵn dùng được cho mọi giá trị thanh trượt
+SEED_POOL = 300
+
+
+def seed_points(sources, n, pool=SEED_POOL):
+    # Hạt giống trên mặt cầu bao quanh các nguồn
+    total = max(n, pool)
+    pts = fibonacci_sphere(total, radius=1.1 * sources.extent() + 0.3)
+    return pts[spread_order(total)][:n]
+
+
+class StreamTracer:
+    def __init__(self, sources, bounds=5.0, terminal=5e-3,
+                 tol=1e-4, h0=0.05, h_min=1e-3, h_max=0.3, max_steps=400, max_length=15.0):
+        self.sources = sources
+        self.bounds = bounds
+        self.terminal = terminal
+        self.tol = tol
+        self.h0 = h0
+        self.h_min = h_min
+        self.h_max = h_max
+        self.max_steps = max_steps
+        self.max_length = max_length
+
+    def direction(self, x, sign):
+        B = self.sources.field(x)
+        return B, sign[:, None] * B / (np.linalg.norm(B, axis=1)[:, None] + 1e-12)
+
+    # ---- ONE DIRECTION ----
+
+    def integrate(self, seeds, sign, cancelled=None):
+        # Trả về (điểm, B) dạng (max_steps + 1, S, 3) và số điểm mỗi đường
+        S = len(seeds)
+        pts = np.zeros((self.max_steps + 1, S, 3), dtype=np.float32)
+        Bs = np.zeros_like(pts)
+        count = np.zeros(S, dtype=np.int64)
+
+        x = seeds.astype(float).copy()
+        h = np.full(S, self.h0)
+        active = np.arange(S)
+        # Điểm hiện tại đã được ghi chưa (bước bị từ chối thì chưa đi tiếp)
+        fresh = np.ones(S, dtype=bool)
+        heading = np.zeros((S, 3))
+        arc = np.zeros(S)
+
+        while len(active):
+            if cancelled is not None and cancelled():
+                return None
+
+            xa, ha, sa = x[active], h[active], sign[active]
+            B, k1 = self.direction(xa, sa)
+
+            rows = fresh[active]
+            new = active[rows]
+            pts[count[new], new] = xa[rows]
+            Bs[count[new], new] = B[rows]
+            count[new] += 1
+            fresh[new] = False
+
+            # ---- DỪNG TỪNG ĐƯỜNG ----
+            reverse = np.sum(heading[active] * k1, axis=1) < 0
+            heading[new] = k1[rows]
+            closed = (arc[active] > 4 * self.h_max) & (
+                np.linalg.norm(xa - seeds[active], axis=1) < 0.5 * self.h_max
+            )
+            stop = (
+                reverse
+                | closed
+                | (arc[active] > self.max_length)
+                | (np.linalg.norm(B, axis=1) < self.terminal)
+                | np.any(np.abs(xa) > self.bounds, axis=1)
+                | (count[active] > self.max_steps)
+            )
+            keep = ~stop
+            active, xa, ha, sa, k1 = active[keep], xa[keep], ha[keep], sa[keep], k1[keep]
+            if not len(active):
+                break
+
+            # ---- BƯỚC CASH–KARP ----
+            k = [k1]
+            for s in range(1, 6):
+                dx = sum(A[s, j] * k[j] for j in range(s))
+                k.append(self.direction(xa + ha[:, None] * dx, sa)[1])
+
+            y5 = xa + ha[:, None] * sum(C5[j] * k[j] for j in range(6))
+            y4 = xa + ha[:, None] * sum(C4[j] * k[j] for j in range(6))
+            err = np.linalg.norm(y5 - y4, axis=1) + 1e-16
+
+            accept = (err <= self.tol) | (ha <= self.h_min)
+            x[active[accept]] = y5[accept]
+            arc[active[accept]] += ha[accept]
+            fresh[active[accept]] = True
+
+            scale = 0.9 * (self.tol / err) ** 0.2
+            h[active] = np.clip(ha * np.clip(scale, 0.2, 5.0), self.h_min, self.h_max)
+
+        return pts, Bs, count
+
+    # ---- BOTH DIRECTIONS ----
+
+    def trace(self, seeds, cancelled=None):
+        # Vết hai chiều trong cùng một lô rồi nối: (lùi đảo ngược) + (tiến).
+        # Trả về điểm, B, số điểm mỗi đường và chỉ số hạt giống của đường
+        S = len(seeds)
+        sign = np.concatenate([np.ones(S), -np.ones(S)])
+        result = self.integrate(np.vstack([seeds, seeds]), sign, cancelled)
+        if result is None:
+            return None
+        pts, Bs, count = result
+
+        lines_p, lines_b, seed_ids = [], [], []
+        for s in range(S):
+            nf, nb = count[s], count[S + s]
+            p = np.concatenate([pts[nb - 1:0:-1, S + s], pts[:nf, s]])
+            if len(p) < 2:
+                continue
+            lines_p.append(p)
+            lines_b.append(np.concatenate([Bs[nb - 1:0:-1, S + s], Bs[:nf, s]]))
+            seed_ids.append(s)
+
+        if not lines_p:
+            empty = np.zeros((0, 3), np.float32)
+            return empty, empty, np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+        lengths = np.array([len(p) for p in lines_p])
+        return np.concatenate(lines_p), np.concatenate(lines_b), lengths, np.array(seed_ids)
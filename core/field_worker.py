@@ -0,0 +1,75 @@
+import threading
+
+
+# ================= FIELD WORKER =================
+# Luồng phụ tính trường/đường sức. Yêu cầu mới nhất luôn thắng: yêu cầu
+# cũ đang chạy bị hủy ở điểm kiểm tra kế tiếp, kết quả cũ bị bỏ.
+
+class FieldWorker(threading.Thread):
+    def __init__(self, compute):
+        super().__init__(daemon=True)
+        # compute(params, cancelled) → kết quả, hoặc None nếu bị hủy
+        self.compute = compute
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.request = None
+        self.result = None
+        self.running = True
+        self.working = False
+
+    # ---- GUI THREAD ----
+
+    def submit(self, params):
+        with self.cond:
+            self.generation += 1
+            self.request = (self.generation, params)
+            self.cond.notify()
+
+    def cancel(self):
+        # Bỏ yêu cầu đang chờ/đang tính (giao diện đã có kết quả khác)
+        with self.cond:
+            self.generation += 1
+            self.request = None
+            self.result = None
+
+    def take(self):
+        # Kết quả mới nhất (lấy một lần) hoặc None
+        with self.cond:
+            result, self.result = self.result, None
+            return result
+
+    @property
+    def busy(self):
+        with self.cond:
+            return self.request is not None or self.working
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.generation += 1
+            self.cond.notify()
+        if self.is_alive():
+            self.join()
+
+    # ---- WORKER THREAD ----
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.running and self.request is None:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                gen, params = self.request
+                self.request = None
+                self.working = True
+
+            def cancelled(gen=gen):
+                return gen != self.generation or not self.running
+
+            result = self.compute(params, cancelled)
+
+            with self.cond:
+                self.working = False
+                if result is not None and not cancelled():
+                    self.result = result
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def random_directions(k):
+    # Hướng đều trên mặt cầu
+    d = np.random.randn(k, 3)
+    return d / np.linalg.norm(d, axis=1)[:, None]
+
+
+# ================= GAMMA RAYS =================
+# Mọi tia gamma còn sống nằm chung một bộ đệm cấp phát trước:
+# tia k = đoạn thẳng từ điểm 2k tới 2k + 1, kèm thời gian sống (TTL).
+# Phát thêm = ghi nối đuôi, hết hạn = dồn các tia còn lại lên đầu,
+# tất cả bằng phép toán mảng → một lưới line duy nhất, một lần vẽ.
+
+class GammaRayBuffer:
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        points = np.zeros((2 * capacity, 3), dtype=np.float32)
+        ttl = np.zeros(2 * capacity, dtype=np.float32)
+        if self.count:
+            points[:2 * self.count] = self.points[:2 * self.count]
+            ttl[:2 * self.count] = self.ttl[:2 * self.count]
+
+        self.capacity = capacity
+        self.points = points
+        self.ttl = ttl
+        # Kết nối cố định [2, 2k, 2k + 1]; lúc vẽ chỉ lấy count tia đầu
+        k = np.arange(capacity)
+        self.cells = np.column_stack([np.full(capacity, 2), 2 * k, 2 * k + 1]).ravel()
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, starts, dirs, length, ttl):
+        # True nếu phải cấp phát lại
+        k = len(starts)
+        if k == 0:
+            return False
+
+        grown = False
+        if self.count + k > self.capacity:
+            capacity = self.capacity
+            while self.count + k > capacity:
+                capacity *= 2
+            self.allocate(capacity)
+            grown = True
+
+        a, b = 2 * self.count, 2 * (self.count + k)
+        self.points[a:b:2] = starts
+        self.points[a + 1:b:2] = starts + dirs * length
+        self.ttl[a:b] = ttl
+        self.count += k
+        return grown
+
+    def tick(self):
+        # Tia có TTL = 0 bị bỏ, các tia còn lại giảm TTL và dồn lên đầu
+        n = self.count
+        keep = self.ttl[0:2 * n:2] > 0
+        m = int(np.count_nonzero(keep))
+        if m < n:
+            idx = np.repeat(2 * np.flatnonzero(keep), 2)
+            idx[1::2] += 1
+            self.points[:2 * m] = self.points[idx]
+            self.ttl[:2 * m] = self.ttl[idx]
+        self.ttl[:2 * m] -= 1
+        self.count = m
+
+    def lines(self):
+        return self.cells[:3 * self.count]
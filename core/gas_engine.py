@@ -0,0 +1,273 @@
+import numpy as np
+
+
+# ================= BROAD PHASE =================
+
+NEIGHBOUR_OFFSETS = np.array(
+    np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1])
+).reshape(3, -1).T
+
+
+def cell_list_pairs(pos, cell, half_size, periodic=False):
+    # Lưới đều cạnh `cell`, chỉ xét 27 ô lân cận → cặp (i, j) với i < j
+    n = len(pos)
+    cell = max(cell, 1e-6)
+    off = NEIGHBOUR_OFFSETS
+
+    if periodic:
+        # Ô ở hai mép hộp là lân cận của nhau
+        nc = int(2 * half_size // cell)
+        if nc < 3:
+            i, j = np.triu_indices(n, k=1)
+            return i, j
+        c = np.floor((pos + half_size) / (2 * half_size) * nc).astype(np.int64) % nc
+        key = (c[:, 0] * nc + c[:, 1]) * nc + c[:, 2]
+        nb = (c[:, None, :] + off[None, :, :]) % nc
+        nb_key = ((nb[..., 0] * nc + nb[..., 1]) * nc + nb[..., 2]).ravel()
+    else:
+        c = np.floor((pos + half_size) / cell).astype(np.int64) + 1
+        dims = c.max(axis=0) + 2
+        key = (c[:, 0] * dims[1] + c[:, 1]) * dims[2] + c[:, 2]
+        shift = (off[:, 0] * dims[1] + off[:, 1]) * dims[2] + off[:, 2]
+        nb_key = (key[:, None] + shift[None, :]).ravel()
+
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    start = np.searchsorted(sorted_key, nb_key, side="left")
+    count = np.searchsorted(sorted_key, nb_key, side="right") - start
+
+    owner = np.repeat(np.repeat(np.arange(n), len(off)), count)
+    first = np.repeat(start - np.cumsum(count) + count, count)
+    other = order[first + np.arange(count.sum())]
+
+    keep = owner < other
+    return owner[keep], other[keep]
+
+
+# ================= STATE =================
+
+# mass / radius là số vô hướng (một loại khí) hoặc mảng (N,) theo từng hạt.
+# species: mã loại khí int8 của từng hạt, dùng cho áp suất riêng phần.
+
+class GasState:
+    def __init__(self, n=150, half_size=1.0, mass=1.0, radius=0.04, e=1.0, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.half_size = half_size
+        self.mass = mass
+        self.radius = radius
+        self.e = e
+        self.time = 0.0
+        # Lỗ thoát trên thành +x (0 = kín)
+        self.hole_radius = 0.0
+
+        self.pos = self.rng.uniform(-half_size, half_size, (n, 3))
+        self.vel = self.rng.normal(0, 0.6, (n, 3))
+
+        self.species = np.zeros(n, dtype=np.int8)
+        self.colors = ["#38bdf8"]
+
+    @classmethod
+    def mixture(cls, species, half_size=1.0, e=1.0, seed=None, separated=False):
+        # species: [(số hạt, m, r, màu), ...]
+        counts = [c for c, *_ in species]
+        state = cls(sum(counts), half_size=half_size, e=e, seed=seed)
+
+        state.species = np.repeat(np.arange(len(species), dtype=np.int8), counts)
+        state.mass = np.array([m for _, m, _, _ in species])[state.species]
+        state.radius = np.array([r for _, _, r, _ in species])[state.species]
+        state.colors = [c for *_, c in species]
+        # Cân bằng năng lượng: <m v²> như nhau giữa các loại khí
+        state.vel *= np.sqrt(np.mean(state.mass) / state.mass)[:, None]
+
+        if separated:
+            # Mỗi loại khí một lát theo trục x → quan sát khuếch tán
+            edges = np.linspace(-half_size, half_size, len(species) + 1)
+            lo, hi = edges[state.species], edges[state.species + 1]
+            state.pos[:, 0] = state.rng.uniform(lo, hi)
+
+        return state
+
+    @property
+    def n(self):
+        return len(self.pos)
+
+    @property
+    def n_species(self):
+        return len(self.colors)
+
+    def masses(self):
+        return np.broadcast_to(self.mass, (self.n,))
+
+    def radii(self):
+        return np.broadcast_to(self.radius, (self.n,))
+
+    def max_radius(self):
+        return float(np.max(self.radius))
+
+    @property
+    def volume(self):
+        return (2 * self.half_size) ** 3
+
+
+# ================= ENGINE =================
+
+class GasEngine:
+    def __init__(self, state, T=100):
+        self.state = state
+        # T = None → tắt bộ ổn nhiệt
+        self.T = T
+        # Tổng xung lượng truyền cho thành bình, bộ quan sát đọc rồi xóa
+        self.wall_impulse = 0.0
+        self.wall_impulse_species = np.zeros(state.n_species)
+        # Số hạt thoát qua lỗ theo từng loại khí
+        self.escaped = np.zeros(state.n_species, dtype=np.int64)
+
+    # ---- STEP ----
+
+    def reset(self):
+        # Bước dt cố định không giữ trạng thái dự đoán
+        pass
+
+    def step(self, n_steps=1, dt=0.02):
+        s = self.state
+        for _ in range(n_steps):
+            if self.T is not None:
+                self.apply_temperature()
+            s.pos += s.vel * dt
+            self.wall_collisions()
+            self.particle_collisions()
+            s.time += dt
+
+    # ---- PHYSICS ----
+
+    def apply_temperature(self):
+        target = self.T / 100
+        current = self.temperature() / 100
+        self.state.vel *= np.sqrt(target) / (np.sqrt(current) + 1e-6)
+
+    def wall_collisions(self):
+        s = self.state
+        L = s.half_size
+
+        if s.hole_radius > 0:
+            self.effuse()
+
+        m = s.masses()
+        for i in range(3):
+            hit = np.abs(s.pos[:, i]) > L
+            dp = m[hit] * (1 + s.e) * np.abs(s.vel[hit, i])
+            self.wall_impulse += np.sum(dp)
+            self.wall_impulse_species += np.bincount(
+                s.species[hit], weights=dp, minlength=s.n_species
+            )
+            s.vel[hit, i] *= -s.e
+            s.pos[hit, i] = np.sign(s.pos[hit, i]) * L
+
+    def escapes(self, idx):
+        s = self.state
+        return np.sum(s.pos[idx, 1:] ** 2, axis=-1) < s.hole_radius**2
+
+    def effuse(self):
+        # Hạt qua lỗ trên thành +x được đếm rồi đưa vào lại từ thành -x,
+        # giữ nguyên vận tốc → N và thành phần hỗn hợp không đổi
+        s = self.state
+        out = np.flatnonzero(s.pos[:, 0] > s.half_size)
+        out = out[self.escapes(out)]
+        self.escaped += np.bincount(s.species[out], minlength=s.n_species)
+        s.pos[out, 0] = -s.half_size
+
+    def particle_collisions(self):
+        s = self.state
+        i, j = cell_list_pairs(s.pos, 2 * s.max_radius(), s.half_size)
+
+        rad = s.radii()
+        r = s.pos[i] - s.pos[j]
+        dist = np.linalg.norm(r, axis=1)
+        close = dist < rad[i] + rad[j]
+        i, j, r, dist = i[close], j[close], r[close], dist[close]
+        if len(i) == 0:
+            return
+
+        # Tỉ lệ chia xung lượng theo khối lượng, m bằng nhau → đúng 1/2
+        m = s.masses()
+        wi = m[j] / (m[i] + m[j])
+        wj = m[i] / (m[i] + m[j])
+
+        # Hạt chỉ chạm đúng 1 hạt khác → giải song song
+        touches = np.bincount(np.concatenate([i, j]), minlength=s.n)
+        single = (touches[i] == 1) & (touches[j] == 1)
+
+        n = r[single] / (dist[single, None] + 1e-8)
+        dv = s.vel[i[single]] - s.vel[j[single]]
+        vn = np.sum(dv * n, axis=1)
+        approach = vn < 0
+        J = (-(1 + s.e) * vn[approach])[:, None] * n[approach]
+        s.vel[i[single][approach]] += J * wi[single][approach, None]
+        s.vel[j[single][approach]] -= J * wj[single][approach, None]
+
+        # Va chạm nhiều hạt cùng lúc → giải tuần tự theo thứ tự (i, j)
+        # giống hệt vòng lặp gốc
+        multi = np.flatnonzero(~single)
+        multi = multi[np.lexsort((j[multi], i[multi]))]
+        for k in multi:
+            a, b = i[k], j[k]
+            nk = r[k] / (dist[k] + 1e-8)
+            vn = np.dot(s.vel[a] - s.vel[b], nk)
+            if vn < 0:
+                Jk = -(1 + s.e) * vn
+                s.vel[a] += Jk * wi[k] * nk
+                s.vel[b] -= Jk * wj[k] * nk
+
+    def particle_collisions_bruteforce(self):
+        # Bản O(N²) gốc, giữ lại để đối chiếu
+        s = self.state
+        m, rad = s.masses(), s.radii()
+        for i in range(s.n):
+            for j in range(i + 1, s.n):
+                r = s.pos[i] - s.pos[j]
+                dist = np.linalg.norm(r)
+                if dist < rad[i] + rad[j]:
+                    n = r / (dist + 1e-8)
+                    dv = s.vel[i] - s.vel[j]
+                    vn = np.dot(dv, n)
+                    if vn < 0:
+                        J = -(1 + s.e) * vn
+                        s.vel[i] += J * (m[j] / (m[i] + m[j])) * n
+                        s.vel[j] -= J * (m[i] / (m[i] + m[j])) * n
+
+    # ---- OBSERVABLES ----
+
+    def speeds(self):
+        return np.linalg.norm(self.state.vel, axis=1)
+
+    def kinetic_energy(self):
+        s = self.state
+        return 0.5 * np.sum(s.masses() * np.sum(s.vel**2, axis=1))
+
+    def temperature(self):
+        # Cùng thang đo với thanh trượt T: một loại khí → v_rms² = T / 100,
+        # hỗn hợp → tính theo <m v²> / <m>
+        s = self.state
+        m = s.masses()
+        return 100 * np.mean(m * np.sum(s.vel**2, axis=1)) / np.mean(m)
+
+    def pressure(self):
+        s = self.state
+        return np.sum(s.masses() * np.sum(s.vel**2, axis=1)) / (3 * s.volume)
+
+    def partial_pressures(self):
+        s = self.state
+        mv2 = s.masses() * np.sum(s.vel**2, axis=1)
+        return np.bincount(s.species, weights=mv2, minlength=s.n_species) / (3 * s.volume)
+
+
+if __name__ == "__main__":
+    import time
+
+    engine = GasEngine(GasState(400, seed=0))
+    t0 = time.perf_counter()
+    engine.step(1000, 0.02)
+    elapsed = time.perf_counter() - t0
+    print(f"1000 bước, N=400: {elapsed:.2f}s ({1000 / elapsed:.0f} bước/s)")
+    print(f"P = {engine.pressure():.3f}, T = {engine.temperature():.1f}")
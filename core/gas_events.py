@@ -0,0 +1,240 @@
+import heapq
+
+import numpy as np
+
+from core.gas_engine import GasEngine, cell_list_pairs
+
+
+# ================= EVENT-DRIVEN ENGINE =================
+# Nhảy thẳng từ va chạm này sang va chạm kế tiếp thay vì bước dt cố định.
+# Sự kiện: (t, seq, i, j, count_i, count_j); j = -1..-3 là tường trục
+# (-j - 1), j = -4..-6 là ranh giới ô trục (-j - 4).
+# Sự kiện cũ bị loại lười khi count của hạt đã thay đổi.
+# Hộp chia lưới ô cạnh ≥ 2 r_max: hạt chỉ chạm được hạt ở 27 ô quanh nó, nên
+# chỉ dự đoán cặp lân cận; qua ranh giới ô thì dự đoán lại với ô mới.
+
+class EventDrivenEngine(GasEngine):
+    def __init__(self, state, T=None, max_events=200000):
+        super().__init__(state, T=T)
+        self.max_events = max_events
+        # Mốc khung hình đã yêu cầu; chạm max_events thì state.time tụt sau
+        # mốc này, phần còn lại chạy tiếp ở bước sau
+        self.clock = state.time
+        self.reset()
+
+    # ---- QUEUE ----
+
+    def reset(self):
+        s = self.state
+        L = s.half_size
+        np.clip(s.pos, -L, L, out=s.pos)
+
+        self.count = np.zeros(s.n, dtype=np.int64)
+        self.n_events = 0
+        self.rad = np.array(s.radii())
+        self.m = np.array(s.masses())
+
+        # ~8 hạt mỗi ô: ô to hơn thì nhiều cặp thừa, nhỏ hơn thì sự kiện qua
+        # ô lấn át va chạm trong khí loãng
+        fit = int(2 * L // max(2 * s.max_radius(), 1e-12))
+        self.nc = max(1, min(fit, int(np.cbrt(s.n / 8))))
+        self.width = 2 * L / self.nc
+        self.cell_of = np.clip(
+            np.floor((s.pos + L) / self.width).astype(np.int64), 0, self.nc - 1
+        )
+
+        # Dựng cả hàng đợi một lượt: cặp lân cận lấy từ tâm ô của từng hạt
+        # để khớp đúng ô đang theo dõi
+        t, i, j = self.boundary_events(np.arange(s.n))
+        centers = -L + (self.cell_of + 0.5) * self.width
+        pi, pj = cell_list_pairs(centers, self.width, L)
+        tp = self.pair_times(pi, pj)
+        ok = np.isfinite(tp)
+
+        t = s.time + np.concatenate([t, tp[ok]])
+        i = np.concatenate([i, pi[ok]])
+        j = np.concatenate([j, pj[ok]])
+        zeros = [0] * len(t)
+        self.queue = list(zip(t.tolist(), range(len(t)), i.tolist(), j.tolist(), zeros, zeros))
+        heapq.heapify(self.queue)
+        self.seq = len(t)
+
+    def push(self, t, i, j):
+        cj = self.count[j] if j >= 0 else 0
+        heapq.heappush(self.queue, (t, self.seq, i, j, self.count[i], cj))
+        self.seq += 1
+
+    def boundary_times(self, idx):
+        # (len(idx), 3) thời gian tới tường và tới ranh giới ô theo từng trục
+        s = self.state
+        L = s.half_size
+        x, v, c = s.pos[idx], s.vel[idx], self.cell_of[idx]
+        lo = -L + c * self.width
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            wall = np.where(v > 0, (L - x) / v, np.where(v < 0, (-L - x) / v, np.inf))
+            cross = np.where(
+                (v > 0) & (c < self.nc - 1), (lo + self.width - x) / v,
+                np.where((v < 0) & (c > 0), (lo - x) / v, np.inf),
+            )
+        if self.nc < 3:
+            # Mọi ô đều lân cận nhau
+            cross[:] = np.inf
+        return wall, cross
+
+    def first(self, t, idx, base):
+        # Chỉ giữ sự kiện sớm nhất mỗi loại của từng hạt: sự kiện nào của hạt
+        # xảy ra trước cũng làm các sự kiện còn lại hết hạn
+        k = np.argmin(t, axis=1)
+        tk = t[np.arange(len(idx)), k]
+        ok = np.isfinite(tk)
+        return np.maximum(tk[ok], 0.0), idx[ok], base - k[ok]
+
+    def boundary_events(self, idx):
+        wall, cross = self.boundary_times(idx)
+        events = (self.first(wall, idx, -1), self.first(cross, idx, -4))
+        return [np.concatenate(a) for a in zip(*events)]
+
+    def pair_times(self, i, j):
+        # Thời gian tới lúc hai hạt chạm nhau; inf nếu không chạm
+        s = self.state
+        dr = s.pos[j] - s.pos[i]
+        dv = s.vel[j] - s.vel[i]
+        b = np.einsum("ij,ij->i", dr, dv)
+        a = np.einsum("ij,ij->i", dv, dv)
+        c = np.einsum("ij,ij->i", dr, dr) - (self.rad[i] + self.rad[j]) ** 2
+        disc = b * b - a * c
+
+        ok = (b < 0) & (disc > 0)
+        t = np.full(len(b), np.inf)
+        t[ok] = (-b[ok] - np.sqrt(disc[ok])) / a[ok]
+        t[ok & (c < 0)] = 0.0
+        return np.maximum(t, 0.0)
+
+    def predict(self, i):
+        s = self.state
+
+        # ---- Tường, ranh giới ô ----
+        t, _, j = self.boundary_events(np.array([i]))
+        for tj, k in zip(s.time + t, j):
+            self.push(tj, i, int(k))
+
+        # ---- Hạt–hạt: chỉ hạt ở 27 ô quanh ô của i ----
+        near = np.all(np.abs(self.cell_of - self.cell_of[i]) <= 1, axis=1)
+        near[i] = False
+        self.predict_pairs(i, np.flatnonzero(near))
+
+    def predict_pairs(self, i, others):
+        if len(others) == 0:
+            return
+        t = self.pair_times(i, others)
+        ok = np.isfinite(t)
+        for tj, j in zip(self.state.time + t[ok], others[ok]):
+            self.push(tj, i, int(j))
+
+    def cross(self, i, k):
+        # Qua ranh giới ô: quỹ đạo không đổi nên các sự kiện đã hẹn vẫn đúng;
+        # chỉ thêm lần qua ô kế tiếp và cặp với lớp 9 ô vừa thành lân cận
+        step = 1 if self.state.vel[i, k] > 0 else -1
+        self.cell_of[i, k] += step
+
+        _, cross = self.boundary_times(np.array([i]))
+        t, _, j = self.first(cross, np.array([i]), -4)
+        for tj, kj in zip(self.state.time + t, j):
+            self.push(tj, i, int(kj))
+
+        d = self.cell_of - self.cell_of[i]
+        slab = np.all(np.abs(d) <= 1, axis=1) & (d[:, k] == step)
+        self.predict_pairs(i, np.flatnonzero(slab))
+
+    def valid(self, ev):
+        _, _, i, j, ci, cj = ev
+        if self.count[i] != ci:
+            return False
+        return j < 0 or self.count[j] == cj
+
+    # ---- ADVANCE ----
+
+    def drift(self, t):
+        s = self.state
+        s.pos += s.vel * (t - s.time)
+        s.time = t
+
+    def advance_to(self, t_end):
+        # True nếu tới được t_end; False nếu dừng ở sự kiện cuối vì max_events
+        s = self.state
+        processed = 0
+        while self.queue and self.queue[0][0] <= t_end:
+            if processed >= self.max_events:
+                # Không trôi qua các sự kiện chưa xử lý (hạt sẽ xuyên tường)
+                return False
+
+            ev = heapq.heappop(self.queue)
+            if not self.valid(ev):
+                continue
+
+            t, _, i, j, _, _ = ev
+            self.drift(max(t, s.time))
+
+            if j <= -4:
+                self.cross(i, -j - 4)
+            elif j < 0:
+                k = -j - 1
+                if k == 0 and s.pos[i, 0] > 0 and s.hole_radius > 0 and self.escapes(i):
+                    # Thoát qua lỗ → vào lại từ thành -x
+                    self.escaped[s.species[i]] += 1
+                    s.pos[i, 0] = -s.half_size
+                    self.cell_of[i, 0] = 0
+                else:
+                    s.pos[i, k] = np.sign(s.pos[i, k]) * s.half_size
+                    dp = self.m[i] * (1 + s.e) * abs(s.vel[i, k])
+                    self.wall_impulse += dp
+                    self.wall_impulse_species[s.species[i]] += dp
+                    s.vel[i, k] *= -s.e
+                self.count[i] += 1
+                self.predict(i)
+            else:
+                r = s.pos[i] - s.pos[j]
+                # Pháp tuyến chuẩn hóa đúng → e = 1 bảo toàn năng lượng tuyệt đối
+                n = r / max(np.linalg.norm(r), 1e-12)
+                vn = np.dot(s.vel[i] - s.vel[j], n)
+                if vn < 0:
+                    J = -(1 + s.e) * vn / (self.m[i] + self.m[j])
+                    s.vel[i] += J * self.m[j] * n
+                    s.vel[j] -= J * self.m[i] * n
+                self.count[i] += 1
+                self.count[j] += 1
+                self.predict(i)
+                self.predict(j)
+
+            processed += 1
+            self.n_events += 1
+
+            # Hàng đợi phình quá lớn vì sự kiện hết hạn → dựng lại
+            if len(self.queue) > 64 * s.n + 1024:
+                self.reset()
+
+        self.drift(max(t_end, s.time))
+        return True
+
+    def step(self, n_steps=1, dt=0.02):
+        # Lấy mẫu trạng thái tại các mốc khung hình
+        for _ in range(n_steps):
+            self.clock = max(self.clock, self.state.time) + dt
+            self.advance_to(self.clock)
+            if self.T is not None:
+                self.apply_temperature()
+
+    def apply_temperature(self):
+        factor = np.sqrt(self.T / (self.temperature() + 1e-12))
+        if abs(factor - 1) <= 1e-6:
+            return
+        self.state.vel *= factor
+
+        # Nhân đều vận tốc với factor: quỹ đạo giữ nguyên, mọi sự kiện còn
+        # chờ chỉ đến sớm/muộn hơn: t' = now + (t - now) / factor. Phép đổi
+        # đồng biến nên thứ tự heap giữ nguyên → sửa khóa tại chỗ
+        now = self.state.time
+        self.queue = [
+            (now + (ev[0] - now) / factor,) + ev[1:] for ev in self.queue
+        ]
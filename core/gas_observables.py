@@ -0,0 +1,131 @@
+import numpy as np
+
+
+# ================= RING BUFFER =================
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity)
+        self.idx = 0
+        self.count = 0
+
+    def push(self, x):
+        self.data[self.idx] = x
+        self.idx = (self.idx + 1) % len(self.data)
+        self.count = min(self.count + 1, len(self.data))
+
+    def values(self):
+        # Theo thứ tự thời gian, cũ → mới
+        if self.count < len(self.data):
+            return self.data[:self.count]
+        return np.roll(self.data, -self.idx)
+
+    def last(self):
+        return self.data[self.idx - 1] if self.count else 0.0
+
+    def mean(self):
+        if self.count == 0:
+            return 0.0
+        return self.data[:self.count].mean()
+
+
+# ================= OBSERVABLES =================
+# P từ xung lượng truyền cho thành bình, T từ động năng, và histogram
+# tốc độ cập nhật O(N) vào bộ đệm cố định.
+
+class GasObservables:
+    def __init__(self, n, n_species=1, capacity=300, n_bins=30, v_max=4.0):
+        self.t = RingBuffer(capacity)
+        self.P = RingBuffer(capacity)
+        self.T = RingBuffer(capacity)
+        self.N = RingBuffer(capacity)
+
+        # Áp suất riêng phần và tốc độ thoát qua lỗ theo từng loại khí
+        self.P_species = [RingBuffer(capacity) for _ in range(n_species)]
+        self.effusion = [RingBuffer(capacity) for _ in range(n_species)]
+        self.escaped = np.zeros(n_species, dtype=np.int64)
+
+        self.n_bins = n_bins
+        self.v_max = v_max
+        self.edges = np.linspace(0, v_max, n_bins + 1)
+        self.centers = 0.5 * (self.edges[1:] + self.edges[:-1])
+        self.hist = np.zeros(n_bins)
+
+        self.scratch = np.empty(n)
+        self.bin_idx = np.empty(n, dtype=np.intp)
+
+    def sample(self, engine, elapsed):
+        s = engine.state
+
+        # ---- Áp suất thành bình ----
+        if getattr(engine, "periodic", False):
+            # Biên tuần hoàn không có thành bình → dùng áp suất virial
+            P = engine.pressure()
+            P_species = engine.partial_pressures()
+        else:
+            area = 6 * (2 * s.half_size) ** 2
+            scale = 1 / (area * elapsed) if elapsed > 0 else 0.0
+            P = engine.wall_impulse * scale
+            P_species = engine.wall_impulse_species * scale
+        engine.wall_impulse = 0.0
+        engine.wall_impulse_species[:] = 0.0
+
+        rate = (engine.escaped - self.escaped) / elapsed if elapsed > 0 else 0 * self.escaped
+        self.escaped[:] = engine.escaped
+        for k in range(len(self.P_species)):
+            self.P_species[k].push(P_species[k])
+            self.effusion[k].push(rate[k])
+
+        # ---- T và histogram tốc độ: dùng chung v² trong bộ đệm cố định ----
+        v2 = np.einsum("ij,ij->i", s.vel, s.vel, out=self.scratch)
+        m = s.masses()
+        # Như GasEngine.temperature: 100 <m v²> / <m>
+        T = 100 * np.einsum("i,i->", m, v2) / np.sum(m)
+
+        self.t.push(s.time)
+        self.P.push(P)
+        self.T.push(T)
+        self.N.push(s.n)
+
+        np.sqrt(v2, out=v2)
+        v2 *= self.n_bins / self.v_max
+        np.clip(v2, 0, self.n_bins - 1, out=v2)
+        self.bin_idx[:] = v2
+        self.hist[:] = 0
+        np.add.at(self.hist, self.bin_idx, 1)
+
+    def maxwell_curve(self, T, counts, masses=None):
+        # Phân bố Maxwell–Boltzmann, cùng thang T: kT/<m> = T / 300.
+        # Hỗn hợp: cộng phân bố của từng loại khí, kT/m_k = T/300 · <m>/m_k
+        counts = np.atleast_1d(counts)
+        masses = np.ones(len(counts)) if masses is None else np.asarray(masses, dtype=float)
+        m_mean = np.sum(counts * masses) / np.sum(counts)
+
+        v = self.centers
+        f = np.zeros_like(v)
+        for n_k, m_k in zip(counts, masses):
+            a2 = max(T, 1e-6) / 300 * m_mean / m_k
+            f += n_k * 4 * np.pi * v**2 * (2 * np.pi * a2) ** -1.5 * np.exp(-v**2 / (2 * a2))
+        return f * (self.edges[1] - self.edges[0])
+
+    def summary(self):
+        return {
+            "t": self.t.last(),
+            "P": self.P.mean(),
+            "T": self.T.mean(),
+            "N": self.N.mean(),
+            "hist": self.hist.copy(),
+            "P_species": [b.mean() for b in self.P_species],
+            "effusion": [b.mean() for b in self.effusion],
+        }
+
+    # ---- EXPORT ----
+
+    def export_csv(self, path):
+        columns = [self.t, self.P, self.T, self.N] + self.P_species + self.effusion
+        header = ["t", "P", "T", "N"]
+        header += [f"P_{k}" for k in range(len(self.P_species))]
+        header += [f"effusion_{k}" for k in range(len(self.effusion))]
+
+        table = np.column_stack([b.values() for b in columns])
+        np.savetxt(path, table, delimiter=",", header=",".join(header), comments="", fmt="%.6g")
@@ -0,0 +1,85 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.gas_engine import GasState, GasEngine
+from core.gas_observables import GasObservables
+
+
+# ================= SWEEP P–V–T =================
+# Chạy một lưới cấu hình (V, T, N, m, e) không cần giao diện, mỗi điểm
+# một tiến trình với seed cố định, trả về áp suất trung bình theo thời gian.
+
+COLUMNS = ("V", "T", "N", "m", "e", "seed", "P", "P_std", "P_kin")
+
+
+def run_point(V, T, N, m, e, seed, radius=0.04, dt=0.02, warmup=200, steps=1000, every=10):
+    # V là thể tích hộp (2L)³
+    state = GasState(int(N), half_size=V ** (1 / 3) / 2, mass=m, radius=radius, e=e, seed=seed)
+    engine = GasEngine(state, T=T)
+    obs = GasObservables(state.n, capacity=max(steps // every, 1))
+
+    engine.step(warmup, dt)
+    engine.wall_impulse = 0.0
+
+    for _ in range(steps // every):
+        engine.step(every, dt)
+        obs.sample(engine, every * dt)
+
+    P = obs.P.values()
+    return (V, T, N, m, e, seed, P.mean(), P.std(), engine.pressure())
+
+
+def _run(args):
+    point, kwargs = args
+    return run_point(*point, **kwargs)
+
+
+def sweep(V, T, N, m=(1.0,), e=(1.0,), seed=0, workers=None, **kwargs):
+    points = [
+        (*p, seed + k)
+        for k, p in enumerate(itertools.product(V, T, N, m, e))
+    ]
+    workers = workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(_run, [(p, kwargs) for p in points], chunksize=1))
+
+    return np.array(rows, dtype=float)
+
+
+# ================= OUTPUT =================
+
+def save_results(table, path):
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **{c: table[:, k] for k, c in enumerate(COLUMNS)})
+    else:
+        np.savetxt(path, table, delimiter=",", header=",".join(COLUMNS), comments="", fmt="%.6g")
+
+
+def _floats(text):
+    return [float(x) for x in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quét P–V–T cho khí lý tưởng")
+    parser.add_argument("--V", type=_floats, default=[1, 2, 4, 8, 16])
+    parser.add_argument("--T", type=_floats, default=[100])
+    parser.add_argument("--N", type=_floats, default=[150])
+    parser.add_argument("--m", type=_floats, default=[1.0])
+    parser.add_argument("--e", type=_floats, default=[1.0])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="pvt_sweep.csv")
+    args = parser.parse_args()
+
+    table = sweep(
+        args.V, args.T, args.N, args.m, args.e,
+        seed=args.seed, workers=args.workers, steps=args.steps,
+    )
+    save_results(table, args.out)
+    print(f"Đã ghi {len(table)} điểm vào {args.out}")
@@ -0,0 +1,112 @@
+import threading
+
+import numpy as np
+
+from core.gas_observables import GasObservables
+
+
+# ================= BACKGROUND STEPPING =================
+# Luồng phụ chạy engine.step(); kết quả được chép vào một trong hai bộ
+# đệm float32 pos/speed. Hai bộ đệm này cũng chính là mảng điểm/vô hướng
+# của VTK, luồng giao diện chỉ đổi bộ đệm nào đang được vẽ.
+
+class GasWorker(threading.Thread):
+    def __init__(self, engine, dt=0.02, steps_per_frame=1):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.dt = dt
+        self.steps_per_frame = steps_per_frame
+
+        n = engine.state.n
+        self.buffers = [
+            (np.empty((n, 3), dtype=np.float32), np.empty(n, dtype=np.float32))
+            for _ in range(2)
+        ]
+        self.front = 0
+        self.observables = GasObservables(n, engine.state.n_species)
+        self.summary = self.observables.summary()
+        for k in range(2):
+            self.fill(k)
+
+        self.lock = threading.Lock()
+        self.consumed = threading.Event()
+        self.consumed.set()
+        self.fresh = True
+        self.running = True
+        self.pending = {}
+
+    # ---- GUI THREAD ----
+
+    def set_params(self, **params):
+        with self.lock:
+            self.pending.update(params)
+
+    def latest(self):
+        # Trả về (chỉ số bộ đệm, summary) mới hoặc None nếu chưa có khung mới
+        with self.lock:
+            if not self.fresh:
+                return None
+            self.fresh = False
+            front = self.front
+            summary = self.summary
+        self.consumed.set()
+        return front, summary
+
+    def export_csv(self, path):
+        with self.lock:
+            self.observables.export_csv(path)
+
+    def stop(self):
+        self.running = False
+        self.consumed.set()
+        if self.is_alive():
+            self.join()
+
+    # ---- WORKER THREAD ----
+
+    def fill(self, k):
+        s = self.engine.state
+        pos, speed = self.buffers[k]
+        pos[:] = s.pos
+        np.einsum("ij,ij->i", s.vel, s.vel, out=speed, casting="same_kind")
+        np.sqrt(speed, out=speed)
+
+    def apply_pending(self):
+        with self.lock:
+            params, self.pending = self.pending, {}
+
+        s = self.engine.state
+        changed = False
+        for key, value in params.items():
+            if key == "T":
+                self.engine.T = value
+            elif key in ("dt", "steps_per_frame"):
+                setattr(self, key, value)
+            else:
+                # mass / radius có thể là mảng theo từng hạt
+                changed |= not np.array_equal(getattr(s, key), value)
+                setattr(s, key, value)
+
+        if changed:
+            self.engine.reset()
+
+    def run(self):
+        while self.running:
+            # Chỉ chạy trước giao diện đúng một khung
+            if not self.consumed.wait(0.1):
+                continue
+            self.consumed.clear()
+            if not self.running:
+                break
+
+            self.apply_pending()
+            self.engine.step(self.steps_per_frame, self.dt)
+
+            back = 1 - self.front
+            self.fill(back)
+
+            with self.lock:
+                self.observables.sample(self.engine, self.dt * self.steps_per_frame)
+                self.summary = self.observables.summary()
+                self.front = back
+                self.fresh = True
@@ -0,0 +1,97 @@
+import numpy as np
+
+from core.gas_observables import RingBuffer
+
+
+# ================= GEIGER COUNTER =================
+# Đầu dò đặt trên trục +x, cách tâm mẫu một khoảng d:
+#   - "sphere": quả cầu bán kính size
+#   - "slab":   tấm vuông cạnh 2·size vuông góc trục x
+# Mỗi nhịp thử cả lô tia gamma (gốc o, hướng đơn vị u) một lần:
+#   cầu: b = (c - o)·u, chạm nếu b > 0 và |c - o|² - b² ≤ r² (hoặc o ở trong)
+#   tấm: t = (d - o_x) / u_x > 0, chạm nếu |o_y + t u_y|, |o_z + t u_z| ≤ size
+# Số đếm dồn vào histogram theo ô thời gian; hiệu suất (đếm / phát) lưu theo
+# từng khoảng cách đã đặt để so với góc khối ≈ 1/d².
+
+SHAPES = {"sphere": "CẦU", "slab": "TẤM"}
+
+
+class GeigerCounter:
+    def __init__(self, shape="sphere", distance=4.0, size=0.8, bin_width=1.0, n_bins=60):
+        self.shape = shape
+        self.distance = distance
+        self.size = size
+        self.bin_width = bin_width
+        self.n_bins = n_bins
+
+        # (hình, kích thước, d làm tròn) → [số đếm, số tia phát]
+        self.scan = {}
+        self.reset(0.0)
+
+    @property
+    def center(self):
+        return np.array([self.distance, 0.0, 0.0])
+
+    def reset(self, t):
+        # Số đếm / đơn vị thời gian của từng ô đã đóng
+        self.rates = RingBuffer(self.n_bins)
+        self.bin_times = RingBuffer(self.n_bins)
+        self.bin_end = t + self.bin_width
+        self.current = 0.0
+
+    # ---- HIT TEST ----
+
+    def hits(self, starts, dirs):
+        if self.shape == "sphere":
+            oc = self.center - starts
+            b = np.einsum("ij,ij->i", oc, dirs)
+            c2 = np.einsum("ij,ij->i", oc, oc) - self.size ** 2
+            return (c2 <= 0) | ((b > 0) & (b * b >= c2))
+
+        ux = dirs[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (self.distance - starts[:, 0]) / ux
+        y = starts[:, 1] + t * dirs[:, 1]
+        z = starts[:, 2] + t * dirs[:, 2]
+        return (t > 0) & (np.abs(y) <= self.size) & (np.abs(z) <= self.size)
+
+    # ---- COUNTING ----
+
+    def record(self, t, starts, dirs, weight=1.0):
+        # weight: số hạt thật mỗi tia đại diện (chế độ thống kê)
+        while t >= self.bin_end:
+            self.rates.push(self.current / self.bin_width)
+            self.bin_times.push(self.bin_end)
+            self.current = 0.0
+            self.bin_end += self.bin_width
+
+        hit = self.hits(starts, dirs) if len(starts) else np.zeros(0, dtype=bool)
+        n = np.count_nonzero(hit) * weight
+        self.current += n
+
+        key = (self.shape, self.size, round(self.distance, 1))
+        entry = self.scan.setdefault(key, [0.0, 0.0])
+        entry[0] += n
+        entry[1] += len(starts) * weight
+        return hit
+
+    def efficiency_curve(self):
+        # Hiệu suất đo được theo d với hình/kích thước hiện tại
+        rows = sorted(
+            (d, counted / emitted)
+            for (shape, size, d), (counted, emitted) in self.scan.items()
+            if shape == self.shape and size == self.size and emitted > 0
+        )
+        if not rows:
+            return np.zeros(0), np.zeros(0)
+        d, eff = np.array(rows).T
+        return d, eff
+
+    def expected(self, d):
+        # Tỉ lệ góc khối Ω / 4π nhìn từ tâm mẫu
+        d = np.asarray(d, dtype=float)
+        if self.shape == "sphere":
+            ratio = np.clip(self.size / np.maximum(d, 1e-9), 0.0, 1.0)
+            return 0.5 * (1 - np.sqrt(1 - ratio ** 2))
+        a2 = (2 * self.size) ** 2
+        return np.arcsin(a2 / (a2 + 4 * d ** 2)) / np.pi
@@ -0,0 +1,121 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# ================= MONTE CARLO CHU KỲ BÁN RÃ =================
+# Lặp lại thí nghiệm của NuclearSim (N hạt, thời điểm phân rã ~ Exp(λ),
+# đếm số hạt còn lại sau mỗi dt) hàng nghìn lần không cần giao diện.
+# Mỗi lần ước lượng λ theo hai cách:
+#   - khớp ln N(t) theo t (như học sinh làm trên đồ thị), trọng số N(t)
+#   - hợp lý cực đại có cắt ở t_end: λ = số phân rã / tổng thời gian sống
+# rồi so độ tản của ước lượng theo cỡ mẫu N (≈ 1/√N).
+
+COLUMNS = ("N", "lam", "seed", "lam_fit", "T_fit", "lam_mle", "T_mle", "decayed")
+
+
+def run_experiment(N, lam, seed, dt=0.05, steps=None):
+    # Mặc định chạy đủ 3 chu kỳ bán rã
+    if steps is None:
+        steps = int(np.ceil(3 * np.log(2) / lam / dt))
+    rng = np.random.default_rng(seed)
+    decay_time = np.sort(rng.exponential(1 / lam, int(N)))
+
+    t = np.arange(1, steps + 1) * dt
+    alive = N - np.searchsorted(decay_time, t, side="right")
+
+    ok = alive > 0
+    if np.count_nonzero(ok) >= 2:
+        slope = np.polyfit(t[ok], np.log(alive[ok]), 1, w=np.sqrt(alive[ok]))[0]
+        lam_fit = -slope
+    else:
+        lam_fit = np.nan
+
+    t_end = t[-1]
+    decayed = N - alive[-1]
+    exposure = np.sum(np.minimum(decay_time, t_end))
+    lam_mle = decayed / exposure if exposure > 0 else np.nan
+
+    with np.errstate(divide="ignore"):
+        return (
+            N, lam, seed,
+            lam_fit, np.log(2) / lam_fit,
+            lam_mle, np.log(2) / lam_mle,
+            decayed,
+        )
+
+
+def _run(args):
+    N, lam, seeds, kwargs = args
+    return [run_experiment(N, lam, s, **kwargs) for s in seeds]
+
+
+def tasks(N, runs, lam, seed=0, batch=50, **kwargs):
+    # Gom runs lần chạy của mỗi N thành lô để giảm chi phí gửi qua tiến trình;
+    # seed khác nhau cho mọi (N, lần chạy)
+    out = []
+    for k, n in enumerate(N):
+        base = seed + k * runs
+        for a in range(0, runs, batch):
+            seeds = range(base + a, base + min(a + batch, runs))
+            out.append((int(n), lam, list(seeds), kwargs))
+    return out
+
+
+def sweep(N, runs, lam, path, seed=0, workers=None, **kwargs):
+    # Ghi CSV dần theo từng lô xong → dừng giữa chừng vẫn giữ được kết quả
+    workers = workers or os.cpu_count()
+    rows = []
+
+    with open(path, "w") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        f.write(",".join(COLUMNS) + "\n")
+        for batch in pool.map(_run, tasks(N, runs, lam, seed, **kwargs), chunksize=1):
+            np.savetxt(f, np.array(batch, dtype=float), delimiter=",", fmt="%.6g")
+            f.flush()
+            rows.extend(batch)
+
+    return np.array(rows, dtype=float)
+
+
+# ================= OUTPUT =================
+
+def summarize(table):
+    # Mỗi N: trung bình, độ lệch chuẩn tương đối của hai ước lượng T½
+    lines = [f"{'N':>8s} {'lần':>6s} {'T½ khớp':>10s} {'±%':>7s} {'T½ MLE':>10s} {'±%':>7s} {'1/√N %':>7s}"]
+    for n in np.unique(table[:, 0]):
+        rows = table[table[:, 0] == n]
+        T_fit = rows[:, 4][np.isfinite(rows[:, 4])]
+        T_mle = rows[:, 6][np.isfinite(rows[:, 6])]
+        lines.append(
+            f"{int(n):8d} {len(rows):6d} "
+            f"{T_fit.mean():10.4g} {T_fit.std() / T_fit.mean() * 100:7.2f} "
+            f"{T_mle.mean():10.4g} {T_mle.std() / T_mle.mean() * 100:7.2f} "
+            f"{100 / np.sqrt(n):7.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _ints(text):
+    return [int(float(x)) for x in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo ước lượng chu kỳ bán rã")
+    parser.add_argument("--N", type=_ints, default=[100, 500, 2000, 10000])
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--lam", type=float, default=0.05)
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--steps", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="halflife_mc.csv")
+    args = parser.parse_args()
+
+    table = sweep(
+        args.N, args.runs, args.lam, args.out,
+        seed=args.seed, workers=args.workers, dt=args.dt, steps=args.steps,
+    )
+    print(f"Đã ghi {len(table)} lần chạy vào {args.out} (T½ đúng = {np.log(2) / args.lam:.4g})")
+    print(summarize(table))
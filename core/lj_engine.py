@@ -0,0 +1,163 @@
+import numpy as np
+
+from core.gas_engine import GasEngine, cell_list_pairs
+
+
+# ================= LENNARD-JONES ENGINE =================
+# Khí thực: thế Lennard-Jones cắt tại rc, tích phân velocity Verlet.
+# Danh sách lân cận Verlet (bán kính rc + skin) chỉ dựng lại khi có hạt
+# đi quá skin / 2 kể từ lần dựng trước → chi phí gần O(N) mỗi bước.
+
+class LJEngine(GasEngine):
+    def __init__(self, state, T=100, epsilon=0.5, cutoff=2.5, skin=0.5, periodic=False):
+        super().__init__(state, T=T)
+        self.epsilon = epsilon
+        self.cutoff = cutoff
+        self.skin = skin
+        self.periodic = periodic
+        self.n_rebuilds = 0
+        self.reset()
+
+    # ---- NEIGHBOUR LIST ----
+
+    @property
+    def sigma(self):
+        # Đường kính lớn nhất; cặp (i, j) dùng σ = r_i + r_j
+        return 2 * self.state.max_radius()
+
+    def reset(self):
+        s = self.state
+        if self.periodic:
+            self.wrap()
+        else:
+            np.clip(s.pos, -s.half_size, s.half_size, out=s.pos)
+        self.build_neighbours()
+        self.forces = self.compute_forces()
+
+    def build_neighbours(self):
+        s = self.state
+        r_list = (self.cutoff + self.skin) * self.sigma
+        i, j = cell_list_pairs(s.pos, r_list, s.half_size, self.periodic)
+
+        dr = self.minimum_image(s.pos[i] - s.pos[j])
+        keep = np.sum(dr * dr, axis=1) < r_list**2
+        self.pair_i, self.pair_j = i[keep], j[keep]
+
+        self.ref_pos = s.pos.copy()
+        self.n_rebuilds += 1
+
+    def needs_rebuild(self):
+        d = self.minimum_image(self.state.pos - self.ref_pos)
+        max_d2 = np.max(np.sum(d * d, axis=1)) if len(d) else 0.0
+        return max_d2 > (0.5 * self.skin * self.sigma) ** 2
+
+    # ---- BOUNDARIES ----
+
+    def minimum_image(self, dr):
+        if self.periodic:
+            box = 2 * self.state.half_size
+            dr -= box * np.round(dr / box)
+        return dr
+
+    def wrap(self):
+        s = self.state
+        box = 2 * s.half_size
+        s.pos[:] = (s.pos + s.half_size) % box - s.half_size
+
+    # ---- FORCES ----
+
+    def compute_forces(self):
+        s = self.state
+        i, j = self.pair_i, self.pair_j
+        dr = self.minimum_image(s.pos[i] - s.pos[j])
+        r2 = np.sum(dr * dr, axis=1)
+
+        rad = s.radii()
+        sig2 = (rad[i] + rad[j]) ** 2
+        inside = r2 < (self.cutoff**2) * sig2
+        i, j, dr, r2, sig2 = i[inside], j[inside], dr[inside], r2[inside], sig2[inside]
+
+        # Lõi mềm: không để r < 0.8σ làm lực bùng nổ khi hạt chồng nhau
+        r2 = np.maximum(r2, 0.64 * sig2)
+        sr6 = (sig2 / r2) ** 3
+        f_over_r = 24 * self.epsilon * (2 * sr6 * sr6 - sr6) / r2
+        f = f_over_r[:, None] * dr
+
+        F = np.empty_like(s.pos)
+        for k in range(3):
+            F[:, k] = (
+                np.bincount(i, weights=f[:, k], minlength=s.n)
+                - np.bincount(j, weights=f[:, k], minlength=s.n)
+            )
+
+        self.virial = np.sum(f * dr)
+        return F
+
+    # ---- STEP ----
+
+    def step(self, n_steps=1, dt=0.02):
+        s = self.state
+        for _ in range(n_steps):
+            if self.T is not None:
+                self.apply_temperature()
+
+            # Chia nhỏ dt để hạt đi không quá 3% σ mỗi bước con
+            v_max = np.sqrt(np.max(np.sum(s.vel**2, axis=1))) + 1e-6
+            sigma_min = 2 * float(np.min(s.radius))
+            n_sub = max(1, int(np.ceil(dt * v_max / (0.03 * sigma_min))))
+            h = dt / n_sub
+            inv_m = 1 / s.masses()[:, None]
+
+            for _ in range(n_sub):
+                s.vel += 0.5 * h * self.forces * inv_m
+                s.pos += s.vel * h
+                if self.periodic:
+                    self.wrap()
+                else:
+                    self.wall_collisions()
+                if self.needs_rebuild():
+                    self.build_neighbours()
+                self.forces = self.compute_forces()
+                s.vel += 0.5 * h * self.forces * inv_m
+
+            s.time += dt
+
+    # ---- OBSERVABLES ----
+
+    def potential_energy(self):
+        s = self.state
+        i, j = self.pair_i, self.pair_j
+        dr = self.minimum_image(s.pos[i] - s.pos[j])
+        r2 = np.sum(dr * dr, axis=1)
+        rad = s.radii()
+        sig2 = (rad[i] + rad[j]) ** 2
+        inside = r2 < (self.cutoff**2) * sig2
+        r2, sig2 = r2[inside], sig2[inside]
+        sr6 = (sig2 / np.maximum(r2, 0.64 * sig2)) ** 3
+        # Dịch thế để U liên tục tại rc
+        sc6 = self.cutoff ** -6
+        shift = sc6 * sc6 - sc6
+        return np.sum(4 * self.epsilon * (sr6 * sr6 - sr6 - shift))
+
+    def pressure(self):
+        # Áp suất virial: P = (Σ m v² + Σ r·F) / 3V
+        s = self.state
+        return (np.sum(s.masses() * np.sum(s.vel**2, axis=1)) + self.virial) / (3 * s.volume)
+
+
+if __name__ == "__main__":
+    import time
+
+    from core.gas_engine import GasState
+
+    for periodic in (False, True):
+        state = GasState(2000, half_size=1.0, radius=0.02, seed=0)
+        engine = LJEngine(state, T=20, periodic=periodic)
+        t0 = time.perf_counter()
+        engine.step(50, 0.02)
+        elapsed = time.perf_counter() - t0
+        print(
+            f"periodic={periodic}: 50 bước N=2000 trong {elapsed:.2f}s, "
+            f"{engine.n_rebuilds} lần dựng lại danh sách, "
+            f"U = {engine.potential_energy():.2f}, P = {engine.pressure():.3f}"
+        )
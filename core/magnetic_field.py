@@ -0,0 +1,187 @@
+from collections import OrderedDict
+
+import numpy as np
+import pyvista as pv
+
+from core.field_model import build_scene
+from core.field_tracer import StreamTracer, seed_points
+
+
+# ================= CACHE =================
+# B chỉ nhân tuyến tính vào trường → lưu trường với cường độ đơn vị theo
+# hình học (cấu hình, chiều dài, khe hở): nguồn, các lưới theo grid_n và
+# các bộ đường sức đã dựng.
+# Đẩy mục ít dùng nhất ra khi vượt ngân sách bộ nhớ.
+
+class FieldCache:
+    def __init__(self, budget_bytes=256 * 1024**2):
+        self.budget = budget_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)["nbytes"]
+        entry["nbytes"] = entry_size(entry)
+        self.entries[key] = entry
+        self.nbytes += entry["nbytes"]
+
+        while self.nbytes > self.budget and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.nbytes -= old["nbytes"]
+
+
+def entry_size(entry):
+    size = 0
+    for mesh in (*entry["grids"].values(), *entry["streams"].values()):
+        size += mesh.actual_memory_size * 1024
+    return size
+
+
+# ================= FIELD LINES =================
+# Chạy trên luồng phụ: giữa các bước đều kiểm tra cancelled() để bỏ
+# ngang khi đã có giá trị thanh trượt mới hơn.
+# Mặc định vết RK45 trên trường giải tích (không phụ thuộc grid_n);
+# đường cũ qua lưới ImageData + VTK vẫn giữ để so sánh.
+# Nếu đã dựng atlas (core/field_atlas.py) thì các nấc có sẵn lấy thẳng từ file.
+
+# Cường độ tham chiếu cho ngưỡng dừng: hình dạng đường sức không phụ thuộc B
+B_REF = 10
+TERMINAL_SPEED = 5e-2
+
+
+class FieldLineBuilder:
+    def __init__(self, cache=None, atlas=None):
+        self.cache = cache or FieldCache()
+        self.atlas = atlas
+
+    def __call__(self, params, cancelled):
+        key = (params["scene"], params["magnet_len"], params["gap"])
+
+        entry = self.cache.get(key)
+        if entry is None:
+            sources = build_scene(params["scene"], params["magnet_len"], params["gap"])
+            entry = {"sources": sources, "grids": {}, "streams": {}}
+            self.cache.put(key, entry)
+
+        if params["tracer"] == "grid":
+            stream_key = ("grid", params["grid_n"], params["stream_count"])
+        else:
+            stream_key = ("rk45", params["stream_count"])
+
+        stream = entry["streams"].get(stream_key)
+        if stream is None:
+            stream = self.build_stream(entry, params, cancelled)
+            if stream is None or cancelled():
+                return None
+            entry["streams"][stream_key] = stream
+            self.cache.put(key, entry)
+
+        # Ống do pipeline VTK phía giao diện dựng, ở đây chỉ trả đường sức
+        return {"params": params, "stream": stream}
+
+    def build_stream(self, entry, params, cancelled):
+        if params["tracer"] == "grid":
+            return grid_streamlines(entry, params, cancelled)
+
+        # Có sẵn trong atlas → chỉ cắt lát file, khỏi vết
+        if self.atlas is not None:
+            hit = self.atlas.lookup(params["scene"], params["magnet_len"], params["gap"])
+            if hit is not None and hit[1]:
+                stream = atlas_streamlines(self.atlas, hit[0], params["stream_count"])
+                if stream is not None:
+                    return stream
+
+        return traced_streamlines(entry["sources"], params["stream_count"], cancelled)
+
+
+def log_magnitude(B):
+    return np.log10(np.linalg.norm(B, axis=1) + 1e-12)
+
+
+# ---- RK45 TRÊN TRƯỜNG GIẢI TÍCH ----
+
+def traced_streamlines(sources, count, cancelled):
+    tracer = StreamTracer(sources, terminal=TERMINAL_SPEED / B_REF)
+    result = tracer.trace(seed_points(sources, count), cancelled)
+    if result is None:
+        return None
+    points, B, lengths, _ = result
+    poly = polylines(points, lengths)
+    poly["logB_unit"] = log_magnitude(B)
+    return poly
+
+
+def atlas_streamlines(atlas, entry, count):
+    # Lát của file atlas → PolyData, không tính gì
+    result = atlas.lines(entry, count)
+    if result is None:
+        return None
+    points, logB, lengths = result
+    poly = polylines(np.array(points), lengths)
+    poly["logB_unit"] = np.array(logB)
+    return poly
+
+
+def polylines(points, lengths):
+    poly = pv.PolyData(points)
+    if not len(lengths):
+        return poly
+
+    # Mảng cell VTK: [n0, 0..n0-1, n1, n0..n0+n1-1, ...]
+    starts = np.concatenate([[0], np.cumsum(lengths[:-1] + 1)])
+    cells = np.empty(len(lengths) + int(np.sum(lengths)), dtype=np.int64)
+    is_count = np.zeros(len(cells), dtype=bool)
+    is_count[starts] = True
+    cells[is_count] = lengths
+    cells[~is_count] = np.arange(len(points))
+
+    poly.lines = cells
+    return poly
+
+
+# ---- LƯỚI + VTK ----
+
+def grid_streamlines(entry, params, cancelled):
+    grid = entry["grids"].get(params["grid_n"])
+    if grid is None:
+        grid = unit_field_grid(entry["sources"], params["grid_n"], cancelled)
+        if grid is None:
+            return None
+        entry["grids"][params["grid_n"]] = grid
+
+    stream = grid.streamlines(
+        vectors="B",
+        n_points=params["stream_count"],
+        max_steps=300,
+        terminal_speed=TERMINAL_SPEED / B_REF,
+        initial_step_length=0.3
+    )
+    stream["logB_unit"] = log_magnitude(stream["B"])
+    return stream
+
+
+def unit_field_grid(sources, n, cancelled):
+    grid = pv.ImageData(
+        dimensions=(n,) * 3,
+        spacing=(0.35, 0.35, 0.35),
+        origin=(-5, -5, -5)
+    )
+
+    B = sources.field(grid.points, cancelled=cancelled)
+    if B is None:
+        return None
+    grid["B"] = B
+    return grid
+
+
+def strength_range(B, clim=(-2, 2)):
+    # Màu theo log|B| = logB_unit + log10(B): đổi B chỉ cần dịch thang màu
+    shift = np.log10(B)
+    return clim[0] - shift, clim[1] - shift
@@ -0,0 +1,134 @@
+import json
+import os
+
+import numpy as np
+
+
+# ================= TRAJECTORY FILE =================
+# [header 4 KB: magic + JSON chỉ mục] [frame 0] [frame 1] ...
+# Mỗi frame có kích thước cố định: t (float64), pos (N×3 float32),
+# các mảng vô hướng (N float32) → frame k nằm ở offset cố định, tua O(1).
+
+MAGIC = b"STEMTRJ1"
+HEADER_SIZE = 4096
+
+
+def frame_dtype(n_points, scalars):
+    fields = [("t", "<f8"), ("pos", "<f4", (n_points, 3))]
+    fields += [(name, "<f4", (n_points,)) for name in scalars]
+    return np.dtype(fields)
+
+
+def write_header(f, meta):
+    blob = json.dumps(meta).encode("utf-8")
+    if len(MAGIC) + len(blob) > HEADER_SIZE:
+        raise ValueError("Header quá lớn")
+    f.seek(0)
+    f.write(MAGIC + blob.ljust(HEADER_SIZE - len(MAGIC), b" "))
+
+
+def read_header(f):
+    f.seek(0)
+    raw = f.read(HEADER_SIZE)
+    if not raw.startswith(MAGIC):
+        raise ValueError("Không phải file bản ghi quỹ đạo")
+    return json.loads(raw[len(MAGIC):].decode("utf-8"))
+
+
+# ================= RECORDER =================
+
+class TrajectoryRecorder:
+    def __init__(self, path, n_points, scalars=(), chunk_frames=256):
+        self.path = path
+        self.meta = {
+            "n_points": int(n_points),
+            "scalars": list(scalars),
+            "n_frames": 0,
+            "chunk_frames": chunk_frames,
+        }
+        self.dtype = frame_dtype(n_points, scalars)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.capacity = 0
+
+        self.f = open(path, "w+b")
+        write_header(self.f, self.meta)
+
+    @property
+    def n_frames(self):
+        return self.meta["n_frames"]
+
+    def append(self, t, pos, **scalars):
+        # Cấp phát trước theo từng khối frame để file không bị phân mảnh
+        k = self.meta["n_frames"]
+        if k >= self.capacity:
+            self.capacity += self.meta["chunk_frames"]
+            self.f.truncate(HEADER_SIZE + self.capacity * self.dtype.itemsize)
+            # Cập nhật chỉ mục theo từng khối: bản ghi bị ngắt vẫn đọc được
+            write_header(self.f, self.meta)
+
+        rec = self.record[0]
+        rec["t"] = t
+        rec["pos"] = pos
+        for name in self.meta["scalars"]:
+            rec[name] = scalars[name]
+
+        self.f.seek(HEADER_SIZE + k * self.dtype.itemsize)
+        self.f.write(self.record.tobytes())
+        self.meta["n_frames"] = k + 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        # Cắt phần khối thừa, ghi lại số frame vào header
+        self.f.truncate(HEADER_SIZE + self.n_frames * self.dtype.itemsize)
+        write_header(self.f, self.meta)
+        self.f.close()
+
+
+# ================= REPLAY =================
+
+class TrajectoryReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.meta = read_header(f)
+
+        self.n_points = self.meta["n_points"]
+        self.scalars = self.meta["scalars"]
+        self.dtype = frame_dtype(self.n_points, self.scalars)
+
+        n_frames = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        self.n_frames = min(self.meta["n_frames"], n_frames)
+        if self.n_frames == 0:
+            raise ValueError("Bản ghi rỗng")
+
+        self.frames = np.memmap(
+            path, dtype=self.dtype, mode="r",
+            offset=HEADER_SIZE, shape=(self.n_frames,)
+        )
+
+    def __len__(self):
+        return self.n_frames
+
+    def frame(self, k):
+        # Chỉ đọc đúng trang chứa frame k
+        rec = self.frames[k]
+        return float(rec["t"]), rec["pos"], {name: rec[name] for name in self.scalars}
+
+    def close(self):
+        del self.frames
+
+
+def open_trajectory(path, scalar):
+    # Mở bản ghi cho một mô phỏng cụ thể: mọi lỗi (không phải .trj, rỗng,
+    # header hỏng, bản ghi của mô phỏng khác) đều thành ValueError
+    try:
+        reader = TrajectoryReader(path)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Header bản ghi thiếu trường {e}") from e
+    except OSError as e:
+        raise ValueError(f"Không đọc được file: {e}") from e
+
+    if scalar not in reader.scalars:
+        reader.close()
+        raise ValueError(f"Bản ghi không có dữ liệu '{scalar}' (của mô phỏng khác?)")
+    return reader
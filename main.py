@@ -53,6 +53,8 @@ class AppController(MainWindow):
 
     def load_module(self, key):
         # Đóng sim cũ
+        if self.current_sim and hasattr(self.current_sim, "stop"):
+            self.current_sim.stop()
         if self.current_sim and hasattr(self.current_sim, "plotter"):
             self.current_sim.plotter.close()
             self.current_sim = None
@@ -1,9 +1,17 @@
 import pyvista as pv
 import numpy as np
 from pyvistaqt import BackgroundPlotter
-from PyQt6.QtWidgets import QLabel, QSlider, QVBoxLayout
+from PyQt6.QtWidgets import (
+    QLabel, QSlider, QVBoxLayout, QCheckBox, QPushButton, QFileDialog, QMessageBox
+)
 from PyQt6.QtCore import Qt
 
+from core.gas_engine import GasState, GasEngine
+from core.gas_events import EventDrivenEngine
+from core.lj_engine import LJEngine
+from core.gas_worker import GasWorker
+from core.recorder import TrajectoryRecorder, open_trajectory
+
 
 class IdealGasSim:
     def __init__(self, display_layout, param_layout):
@@ -19,6 +27,15 @@ class IdealGasSim:
         self.e = 1.0
         self.dt = 0.02
         self.v_scale = 1.0
+        self.steps_per_frame = 1
+        self.event_driven = False
+        self.lennard_jones = False
+        self.periodic = False
+        self.mixture = False
+        self.effusion = False
+
+        self.recorder = None
+        self.replay = None
 
         self.init_particles()
 
@@ -30,6 +47,7 @@ class IdealGasSim:
 
         # ===== UI =====
         self.build_ui(param_layout)
+        self.build_histogram()
 
         # ===== Update loop =====
         self.plotter.add_callback(self.update, interval=16)
@@ -37,23 +55,94 @@ class IdealGasSim:
     # ================= INIT =================
 
     def init_particles(self):
-        self.pos = np.random.uniform(-self.v_scale, self.v_scale, (self.n, 3))
-        self.vel = np.random.normal(0, 0.6, (self.n, 3))
-
-        self.particles = pv.PolyData(self.pos)
-        self.particles["speed"] = np.linalg.norm(self.vel, axis=1)
+        if self.mixture:
+            # Hỗn hợp 2 khí nhẹ / nặng, ban đầu tách đôi hộp để xem khuếch tán.
+            # Có lỗ thoát thì trộn đều ngay: khí nặng nằm sát lỗ (+x) làm lệch
+            # tỉ lệ Graham cho tới khi hai khí trộn xong
+            light = self.n // 2
+            self.state = GasState.mixture(
+                [
+                    (light, 1.0, 0.03, "#38bdf8"),
+                    (self.n - light, 4.0, 0.05, "#f97316"),
+                ],
+                half_size=self.v_scale, e=self.e, separated=not self.effusion,
+            )
+        else:
+            self.state = GasState(
+                self.n, half_size=self.v_scale,
+                mass=self.mass, radius=self.radius, e=self.e
+            )
+
+        m = self.state.masses()
+        self.species_counts = np.bincount(self.state.species)
+        self.species_masses = [m[self.state.species == k][0] for k in range(self.state.n_species)]
+
+        # Bản ghi có N cố định → dừng ghi khi đổi N
+        if self.recorder is not None:
+            self.btn_record.setChecked(False)
+
+        self.make_engine()
+
+    def make_mesh(self, points, speed, state=None):
+        self.particles = pv.PolyData(points)
+        self.particles["speed"] = speed
 
         if hasattr(self, "actor"):
             self.plotter.remove_actor(self.actor)
 
+        # Hỗn hợp: tô màu theo loại khí thay vì theo tốc độ
+        if state is not None and state.n_species > 1:
+            self.particles["species"] = state.species.astype(np.float32)
+            scalars, cmap = "species", state.colors
+        else:
+            scalars, cmap = "speed", "coolwarm"
+
         self.actor = self.plotter.add_mesh(
             self.particles,
-            scalars="speed",
-            cmap="coolwarm",
+            scalars=scalars,
+            cmap=cmap,
             render_points_as_spheres=True,
             point_size=10,
+            show_scalar_bar=False,
         )
 
+    def make_engine(self):
+        T = self.s_t.value() if hasattr(self, "s_t") else 100
+
+        if hasattr(self, "worker"):
+            self.worker.stop()
+
+        if self.lennard_jones:
+            self.engine = LJEngine(self.state, T=T, periodic=self.periodic)
+        elif self.event_driven:
+            self.engine = EventDrivenEngine(self.state, T=T)
+        else:
+            self.engine = GasEngine(self.state, T=T)
+        self.worker = GasWorker(self.engine, self.dt, self.steps_per_frame)
+        self.bind_buffers()
+        self.worker.start()
+
+    def bind_buffers(self):
+        # Bọc 2 bộ đệm float32 của luồng vật lý thành mảng VTK một lần,
+        # mỗi khung chỉ đổi con trỏ, không chép dữ liệu
+        self.vtk_points = [pv.vtk_points(pos, deep=False) for pos, _ in self.worker.buffers]
+        self.vtk_speed = [
+            pv.convert_array(speed, name="speed") for _, speed in self.worker.buffers
+        ]
+        self.make_mesh(*self.worker.buffers[self.worker.front], self.state)
+
+    def show_buffer(self, k):
+        self.vtk_points[k].Modified()
+        self.vtk_speed[k].Modified()
+        self.particles.SetPoints(self.vtk_points[k])
+        self.particles.GetPointData().AddArray(self.vtk_speed[k])
+        self.particles.Modified()
+
+    def stop(self):
+        self.worker.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+
     # ================= UI =================
 
     def slider(self, text, minv, maxv, val):
@@ -69,7 +158,7 @@ class IdealGasSim:
 
         _, self.s_v = self.slider("V", 6, 30, 10)
         _, self.s_t = self.slider("T", 10, 300, 100)
-        _, self.s_n = self.slider("N", 50, 400, self.n)
+        _, self.s_n = self.slider("N", 50, 2000, self.n)
 
         layout.addWidget(QLabel("THỂ TÍCH (V)"))
         layout.addWidget(self.s_v)
@@ -80,6 +169,12 @@ class IdealGasSim:
 
         self.lbl_p = QLabel("ÁP SUẤT (P): 0.0")
         layout.addWidget(self.lbl_p)
+        self.lbl_t = QLabel("NHIỆT ĐỘ ĐO (T): 0.0")
+        layout.addWidget(self.lbl_t)
+
+        btn_export = QPushButton("XUẤT SỐ LIỆU (CSV)")
+        btn_export.clicked.connect(self.export_csv)
+        layout.addWidget(btn_export)
 
         # ---- PARTICLE ----
         layout.addWidget(QLabel("PHÂN TỬ"))
@@ -102,41 +197,156 @@ class IdealGasSim:
         layout.addWidget(QLabel("BƯỚC THỜI GIAN (dt)"))
         layout.addWidget(self.s_dt)
 
-    # ================= PHYSICS =================
-
-    def apply_temperature(self):
-        T = self.s_t.value()
-        target = np.sqrt(T / 100)
-        rms = np.sqrt(np.mean(np.sum(self.vel**2, axis=1)))
-        self.vel *= target / (rms + 1e-6)
-
-    def wall_collisions(self):
-        for i in range(3):
-            hit = np.abs(self.pos[:, i]) > self.v_scale
-            self.vel[hit, i] *= -self.e
-            self.pos[hit, i] = np.sign(self.pos[hit, i]) * self.v_scale
-
-    def particle_collisions(self):
-        for i in range(self.n):
-            for j in range(i + 1, self.n):
-                r = self.pos[i] - self.pos[j]
-                dist = np.linalg.norm(r)
-                if dist < 2 * self.radius:
-                    n = r / (dist + 1e-8)
-                    dv = self.vel[i] - self.vel[j]
-                    vn = np.dot(dv, n)
-                    if vn < 0:
-                        J = -(1 + self.e) * vn / 2
-                        self.vel[i] += J * n
-                        self.vel[j] -= J * n
-
-    def compute_pressure(self):
-        V = (2 * self.v_scale) ** 3
-        return np.sum(self.mass * np.sum(self.vel**2, axis=1)) / (3 * V)
+        _, self.s_steps = self.slider("steps", 1, 20, self.steps_per_frame)
+        layout.addWidget(QLabel("SỐ BƯỚC / KHUNG HÌNH"))
+        layout.addWidget(self.s_steps)
+
+        self.cb_event = QCheckBox("VA CHẠM THEO SỰ KIỆN")
+        self.cb_event.toggled.connect(self.set_event_driven)
+        layout.addWidget(self.cb_event)
+
+        # ---- KHÍ THỰC ----
+        layout.addWidget(QLabel("KHÍ THỰC"))
+
+        self.cb_lj = QCheckBox("LENNARD-JONES")
+        self.cb_lj.toggled.connect(self.set_lennard_jones)
+        layout.addWidget(self.cb_lj)
+
+        self.cb_periodic = QCheckBox("BIÊN TUẦN HOÀN")
+        self.cb_periodic.toggled.connect(self.set_periodic)
+        layout.addWidget(self.cb_periodic)
+
+        # ---- HỖN HỢP ----
+        layout.addWidget(QLabel("HỖN HỢP KHÍ"))
+
+        self.cb_mixture = QCheckBox("HAI LOẠI KHÍ (m = 1 : 4)")
+        self.cb_mixture.toggled.connect(self.set_mixture)
+        layout.addWidget(self.cb_mixture)
+
+        self.cb_effusion = QCheckBox("LỖ THOÁT TRÊN THÀNH (GRAHAM)")
+        self.cb_effusion.toggled.connect(self.set_effusion)
+        layout.addWidget(self.cb_effusion)
+
+        self.lbl_mix = QLabel("")
+        layout.addWidget(self.lbl_mix)
+
+        # ---- GHI / PHÁT LẠI ----
+        layout.addWidget(QLabel("GHI / PHÁT LẠI"))
+
+        self.btn_record = QPushButton("GHI HÌNH")
+        self.btn_record.setCheckable(True)
+        self.btn_record.toggled.connect(self.toggle_record)
+        layout.addWidget(self.btn_record)
+
+        self.btn_replay = QPushButton("PHÁT LẠI")
+        self.btn_replay.setCheckable(True)
+        self.btn_replay.toggled.connect(self.toggle_replay)
+        layout.addWidget(self.btn_replay)
+
+        _, self.s_frame = self.slider("frame", 0, 0, 0)
+        layout.addWidget(self.s_frame)
+
+    def build_histogram(self):
+        # Phân bố tốc độ đo được + đường Maxwell–Boltzmann lý thuyết
+        obs = self.worker.observables
+        chart = pv.Chart2D(size=(0.38, 0.3), loc=(0.6, 0.02))
+        chart.background_color = (0.0, 0.0, 0.0, 0.4)
+        chart.x_label = "v"
+        chart.y_label = "N"
+        self.hist_plot = chart.bar(obs.centers, obs.hist, color="#38bdf8")
+        self.mb_plot = chart.line(obs.centers, obs.hist, color="#f59e0b", width=2)
+        self.plotter.add_chart(chart)
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(
+            None, "Xuất số liệu", "khi_ly_tuong.csv", "CSV (*.csv)"
+        )
+        if path:
+            self.worker.export_csv(path)
+
+    # ================= GHI / PHÁT LẠI =================
+
+    def toggle_record(self, on):
+        if on:
+            path, _ = QFileDialog.getSaveFileName(
+                None, "Ghi quỹ đạo", "khi_ly_tuong.trj", "Quỹ đạo (*.trj)"
+            )
+            if not path:
+                self.btn_record.setChecked(False)
+                return
+            self.recorder = TrajectoryRecorder(path, self.n, scalars=("speed",))
+        elif self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def toggle_replay(self, on):
+        if on:
+            path, _ = QFileDialog.getOpenFileName(
+                None, "Mở bản ghi", "", "Quỹ đạo (*.trj)"
+            )
+            if not path:
+                self.btn_replay.setChecked(False)
+                return
+            try:
+                self.replay = open_trajectory(path, "speed")
+            except ValueError as e:
+                QMessageBox.warning(None, "Không mở được bản ghi", str(e))
+                self.btn_replay.setChecked(False)
+                return
+            self.s_frame.setRange(0, len(self.replay) - 1)
+            self.s_frame.setValue(0)
+            _, pos, scalars = self.replay.frame(0)
+            self.make_mesh(pos, scalars["speed"])
+        elif self.replay is not None:
+            self.replay.close()
+            self.replay = None
+            self.s_frame.setRange(0, 0)
+            self.make_mesh(*self.worker.buffers[self.worker.front], self.state)
+
+    def update_replay(self):
+        # Tự chạy tiếp, trừ khi người dùng đang kéo thanh tua
+        k = self.s_frame.value()
+        if not self.s_frame.isSliderDown():
+            k = (k + 1) % len(self.replay)
+            self.s_frame.setValue(k)
+
+        _, pos, scalars = self.replay.frame(k)
+        self.particles.points = pos
+        self.particles["speed"] = scalars["speed"]
+
+    def set_event_driven(self, on):
+        self.event_driven = on
+        self.make_engine()
+
+    def set_lennard_jones(self, on):
+        self.lennard_jones = on
+        self.make_engine()
+
+    def set_periodic(self, on):
+        self.periodic = on
+        self.make_engine()
+
+    def set_mixture(self, on):
+        self.mixture = on
+        self.lbl_mix.setText("")
+        # Hỗn hợp dùng m, r riêng của từng loại khí
+        self.s_m.setEnabled(not on)
+        self.s_r.setEnabled(not on)
+        self.init_particles()
+
+    def set_effusion(self, on):
+        self.effusion = on
+        if self.mixture:
+            self.lbl_mix.setText("")
+            self.init_particles()
 
     # ================= UPDATE =================
 
     def update(self):
+        if self.replay is not None:
+            self.update_replay()
+            return
+
         # Volume
         self.v_scale = self.s_v.value() / 10
         box = pv.Box(bounds=(
@@ -151,22 +361,53 @@ class IdealGasSim:
         self.radius = self.s_r.value() / 1000
         self.e = self.s_e.value() / 100
         self.dt = self.s_dt.value() / 1000
+        self.steps_per_frame = self.s_steps.value()
 
         # N change
         if self.s_n.value() != self.n:
             self.n = self.s_n.value()
             self.init_particles()
 
-        # Physics
-        self.apply_temperature()
-        self.pos += self.vel * self.dt
-        self.wall_collisions()
-        self.particle_collisions()
-
-        # Update mesh
-        self.particles.points = self.pos
-        self.particles["speed"] = np.linalg.norm(self.vel, axis=1)
-
-        # Pressure
-        P = self.compute_pressure()
-        self.lbl_p.setText(f"ÁP SUẤT (P): {P:.3f}")
+        params = dict(
+            half_size=self.v_scale,
+            e=self.e,
+            hole_radius=0.3 * self.v_scale if self.effusion else 0.0,
+            T=self.s_t.value(),
+            dt=self.dt,
+            steps_per_frame=self.steps_per_frame,
+        )
+        # Hỗn hợp giữ m, r riêng của từng loại khí
+        if not self.mixture:
+            params.update(mass=self.mass, radius=self.radius)
+        self.worker.set_params(**params)
+
+        # Swap buffer mới nhất từ luồng vật lý
+        frame = self.worker.latest()
+        if frame is None:
+            return
+        k, obs = frame
+        self.show_buffer(k)
+
+        if self.recorder is not None:
+            pos, speed = self.worker.buffers[k]
+            self.recorder.append(obs["t"], pos, speed=speed)
+
+        # Observables (trung bình theo thời gian)
+        self.lbl_p.setText(f"ÁP SUẤT (P): {obs['P']:.3f}")
+        self.lbl_t.setText(f"NHIỆT ĐỘ ĐO (T): {obs['T']:.1f}")
+
+        if self.mixture:
+            p1, p2 = obs["P_species"]
+            text = f"P RIÊNG PHẦN: {p1:.2f} | {p2:.2f}"
+            if self.effusion:
+                r1, r2 = obs["effusion"]
+                text += f"\nTỐC ĐỘ THOÁT: {r1:.2f} | {r2:.2f}"
+                if r2 > 0:
+                    text += f" (tỉ lệ {r1 / r2:.2f}, lý thuyết 2.00)"
+            self.lbl_mix.setText(text)
+
+        x = self.worker.observables.centers
+        self.hist_plot.update(x, obs["hist"])
+        self.mb_plot.update(x, self.worker.observables.maxwell_curve(
+            obs["T"], self.species_counts, self.species_masses
+        ))
@@ -1,9 +1,20 @@
-import pyvista as pv
+import time
+
 import numpy as np
+import pyvista as pv
 from pyvistaqt import BackgroundPlotter
-from PyQt6.QtWidgets import QLabel, QSlider
+from vtkmodules.vtkFiltersCore import vtkTubeFilter
+from vtkmodules.vtkRenderingCore import vtkActor, vtkPolyDataMapper
+from PyQt6.QtWidgets import QLabel, QSlider, QComboBox, QCheckBox
 from PyQt6.QtCore import Qt, QTimer
 
+from core.field_model import SCENES, build_scene
+from core.charged_particles import ChargedParticles, particle_grid
+from core.field_atlas import load_atlas
+from core.field_probe import SliceSampler, plane_faces, probe
+from core.field_worker import FieldWorker
+from core.magnetic_field import FieldLineBuilder, atlas_streamlines, strength_range
+
 
 class MagneticSim:
     def __init__(self, display_layout, param_layout):
@@ -20,14 +31,49 @@ class MagneticSim:
         self.opacity = 0.75
         self.magnet_len = 0.9
         self.gap = 0.05
+        self.scene = "bar"
+        self.tracer = "rk45"
+        self.q_m = 10
+        self.particle_speed = 1.0
+        self.particle_count = 5000
 
         # ===== DEBOUNCE TIMER =====
         self.update_timer = QTimer()
         self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.update_field)
 
+        # ===== WORKER =====
+        # Tính trường trên luồng phụ, giao diện chỉ nhận lưới ống đã xong.
+        # Atlas dựng sẵn (nếu có) cho các nấc thanh trượt → khỏi tính
+        self.atlas = load_atlas()
+        self.worker = FieldWorker(FieldLineBuilder(atlas=self.atlas))
+        self.worker.start()
+        # Lưới trường cho hạt điện tích (40³ điểm) cũng lấy mẫu trên luồng phụ;
+        # hạt cũ vẫn chạy trên lưới cũ cho tới khi có lưới mới
+        self.grid_worker = FieldWorker(particle_grid)
+        self.grid_worker.start()
+        # Mặt cắt: mỗi lần kéo gửi vị trí mới, luồng phụ chỉ tính vị trí
+        # mới nhất (vị trí cũ đang tính bị hủy) → kéo không chặn giao diện
+        self.slice_worker = FieldWorker(SliceSampler())
+        self.slice_worker.start()
+
+        self.poll_timer = QTimer()
+        self.poll_timer.timeout.connect(self.poll_result)
+        self.poll_timer.start(30)
+
         # ===== UI =====
+        param_layout.addWidget(QLabel("CẤU HÌNH"))
+        self.cb_scene = QComboBox()
+        for key, name in SCENES.items():
+            self.cb_scene.addItem(name, key)
+        self.cb_scene.currentIndexChanged.connect(self.set_scene)
+        param_layout.addWidget(self.cb_scene)
+
         self.make_slider(param_layout, "CƯỜNG ĐỘ NAM CHÂM", 1, 30, self.B, self.set_B)
+        # Mật độ lưới chỉ dùng cho cách vết cũ qua lưới VTK
+        self.cb_grid = QCheckBox("VẾT QUA LƯỚI VTK (CŨ)")
+        self.cb_grid.toggled.connect(self.set_tracer)
+        param_layout.addWidget(self.cb_grid)
         self.make_slider(param_layout, "MẬT ĐỘ LƯỚI", 10, 40, self.grid_n, self.set_grid)
         self.make_slider(param_layout, "SỐ ĐƯỜNG SỨC", 30, 300, self.stream_count, self.set_stream)
         self.make_slider(param_layout, "ĐỘ DÀY ĐƯỜNG", 1, 50, int(self.tube_radius * 1000), self.set_radius)
@@ -35,10 +81,47 @@ class MagneticSim:
         self.make_slider(param_layout, "CHIỀU DÀI NAM CHÂM", 5, 20, int(self.magnet_len * 10), self.set_length)
         self.make_slider(param_layout, "KHE HỞ N–S", 1, 20, int(self.gap * 100), self.set_gap)
 
+        # ---- HẠT ĐIỆN TÍCH ----
+        self.cb_particles = QCheckBox("HẠT ĐIỆN TÍCH (BORIS)")
+        self.cb_particles.toggled.connect(self.set_particles)
+        param_layout.addWidget(self.cb_particles)
+        self.make_slider(param_layout, "q/m CỦA HẠT", 1, 50, self.q_m, self.set_q_m)
+        self.make_slider(param_layout, "TỐC ĐỘ HẠT", 1, 30, int(self.particle_speed * 10), self.set_particle_speed)
+        self.make_slider(param_layout, "SỐ HẠT (NGHÌN)", 1, 20, self.particle_count // 1000, self.set_particle_count)
+
+        # ---- ĐẦU DÒ / MẶT CẮT ----
+        self.cb_probe = QCheckBox("ĐẦU DÒ TỪ TRƯỜNG")
+        self.cb_probe.toggled.connect(self.set_probe)
+        param_layout.addWidget(self.cb_probe)
+        self.cb_slice = QCheckBox("MẶT CẮT |B|")
+        self.cb_slice.toggled.connect(self.set_slice)
+        param_layout.addWidget(self.cb_slice)
+        self.lbl_probe = QLabel("")
+        param_layout.addWidget(self.lbl_probe)
+
+        self.lbl_status = QLabel("")
+        param_layout.addWidget(self.lbl_status)
+
         # ===== INIT =====
-        self.stream_actor = None
+        self.magnet_actors = []
+        self.wire_actors = []
+        self.sources_key = None
+        self.particles = None
+        self.trail_actor = None
+        self.field_grid = None
+        self.field_grid_key = None
+        self.grid_request_key = None
+        self.probe_pos = (2.0, 0.0, 0.0)
+        self.probe_actor = None
+        self.slice_origin = (0.0, 0.0, 0.0)
+        self.slice_normal = (0.0, 0.0, 1.0)
+        self.slice_mesh = None
+        self.slice_actor = None
+        self.make_pipeline()
         self.draw_magnet()
-        self.update_field()
+        self.request_update()
+
+        self.plotter.add_callback(self.update_particles, interval=16)
 
     # ================= UI =================
 
@@ -51,70 +134,318 @@ class MagneticSim:
         layout.addWidget(s)
 
     def request_update(self):
+        self.last_request = time.perf_counter()
+        # Nấc có trong atlas → hiện ngay, không cần tính
+        if self.show_atlas():
+            self.update_timer.stop()
+            self.worker.cancel()
+            self.lbl_status.setText("")
+            return
         # debounce 200ms
         self.update_timer.start(200)
 
-    # ================= MAGNET =================
-
-    def draw_magnet(self):
-        self.plotter.clear_actors()
-
-        L = self.magnet_len
-        g = self.gap
-
-        self.magnet_n = pv.Box(bounds=(-0.3, 0.3, g, g + L, -0.3, 0.3))
-        self.magnet_s = pv.Box(bounds=(-0.3, 0.3, -g - L, -g, -0.3, 0.3))
-
-        self.plotter.add_mesh(self.magnet_n, color="#ff3b3b", metallic=0.7)
-        self.plotter.add_mesh(self.magnet_s, color="#3b6cff", metallic=0.7)
-
-    # ================= PHYSICS =================
-
-    def dipole_field(self, r, m):
-        r_mag = np.linalg.norm(r, axis=1)[:, None] + 1e-4
-        r_hat = r / r_mag
-        dot = np.sum(m * r_hat, axis=1)[:, None]
-        return (3 * dot * r_hat - m) / (r_mag ** 3)
+    # ================= FIELD-LINE PIPELINE =================
+    # Một pipeline cố định: đường sức → vtkTubeFilter → mapper → một actor.
+    # Đường sức mới chỉ thay dữ liệu đầu vào; bán kính, độ trong, cường độ
+    # chỉ đổi tham số của filter / property / thang màu.
+
+    def make_pipeline(self):
+        self.lines = pv.PolyData()
+
+        self.tube_filter = vtkTubeFilter()
+        self.tube_filter.SetInputData(self.lines)
+        self.tube_filter.SetRadius(self.tube_radius)
+        self.tube_filter.SetNumberOfSides(20)
+        self.tube_filter.CappingOn()
+
+        self.stream_mapper = vtkPolyDataMapper()
+        self.stream_mapper.SetInputConnection(self.tube_filter.GetOutputPort())
+        self.stream_mapper.SetScalarModeToUsePointFieldData()
+        self.stream_mapper.SelectColorArray("logB_unit")
+        self.stream_mapper.SetLookupTable(pv.LookupTable(cmap="cool"))
+        self.stream_mapper.SetScalarRange(*strength_range(self.B))
+        self.stream_mapper.ScalarVisibilityOn()
+
+        self.stream_actor = vtkActor()
+        self.stream_actor.SetMapper(self.stream_mapper)
+        prop = self.stream_actor.GetProperty()
+        prop.SetOpacity(self.opacity)
+        prop.SetInterpolationToPhong()
+
+        self.plotter.add_actor(self.stream_actor, reset_camera=False)
+
+    def show_stream(self, stream):
+        # Thay đầu vào của pipeline, filter tự chạy lại ở lần render kế tiếp
+        self.draw_magnet()
+        self.lines.shallow_copy(stream)
+        self.lines.Modified()
+        self.plotter.render()
 
-    # ================= UPDATE (NẶNG) =================
+    # ================= MAGNET =================
 
-    def update_field(self):
-        self.draw_magnet()
+    def current_sources(self):
+        key = (self.scene, self.magnet_len, self.gap)
+        if key != self.sources_key:
+            self.sources = build_scene(*key)
+            self.sources_key = key
+        return self.sources
 
-        self.grid = pv.ImageData(
-            dimensions=(self.grid_n,) * 3,
-            spacing=(0.35, 0.35, 0.35),
-            origin=(-5, -5, -5)
+    def draw_magnet(self):
+        # Vẽ đúng các nguồn đang dùng để tính trường; cập nhật lưới tại chỗ,
+        # chỉ thêm actor khi cấu hình cần nhiều khối hơn trước
+        sources = self.current_sources()
+
+        boxes = [(pv.Box(bounds=bounds), color) for bounds, color in sources.boxes]
+        wires = [
+            (pv.Spline(wire, len(wire)).tube(radius=0.03), "#d08a3a")
+            for wire in sources.wires
+        ]
+        self.update_parts(self.magnet_actors, boxes, metallic=0.7)
+        self.update_parts(self.wire_actors, wires, metallic=0.8)
+
+        # Đầu dò / mặt cắt đang bật → đọc lại theo hình học mới
+        if self.cb_probe.isChecked():
+            self.move_probe(self.probe_pos)
+        if self.cb_slice.isChecked():
+            self.move_slice(self.slice_normal, self.slice_origin)
+
+    def update_parts(self, actors, meshes, **kwargs):
+        for k, (mesh, color) in enumerate(meshes):
+            if k < len(actors):
+                actors[k].mapper.dataset.deep_copy(mesh)
+                actors[k].prop.color = color
+            else:
+                actors.append(self.plotter.add_mesh(mesh.copy(), color=color, **kwargs))
+            actors[k].SetVisibility(True)
+
+        for actor in actors[len(meshes):]:
+            actor.SetVisibility(False)
+
+    # ================= CHARGED PARTICLES =================
+    # Cả lô hạt đẩy bằng Boris trên trường lấy mẫu từ cùng mô hình nguồn.
+    # Vệt của mọi hạt là một PolyData polyline bọc thẳng mảng float32,
+    # mỗi khung chỉ ghi tại chỗ rồi đánh dấu Modified().
+
+    def request_grid(self, key):
+        if key != self.grid_request_key:
+            self.grid_request_key = key
+            self.grid_worker.submit(key)
+            self.lbl_status.setText("ĐANG LẤY MẪU TRƯỜNG CHO HẠT...")
+
+    def make_particles(self):
+        # Chưa có lưới cho hình học hiện tại → xin lưới, tạo hạt khi có
+        key = (self.scene, self.magnet_len, self.gap)
+        if self.field_grid_key != key:
+            self.request_grid(key)
+            return
+
+        sources = self.current_sources()
+        self.particles = ChargedParticles(
+            self.field_grid, self.particle_count,
+            q_m=self.q_m, speed=self.particle_speed, B=self.B,
+            keep_out=[bounds for bounds, _ in sources.boxes],
+            inner_radius=0.6 if sources.wires else 0.0,
+        )
+        self.make_trails()
+
+    def make_trails(self):
+        n, T = self.particles.trail.shape[:2]
+        self.trail_points = pv.vtk_points(self.particles.trail.reshape(-1, 3), deep=False)
+
+        # Mỗi hạt một polyline T điểm liên tiếp: [T, iT, ..., iT + T - 1]
+        cells = np.empty((n, T + 1), dtype=np.int64)
+        cells[:, 0] = T
+        cells[:, 1:] = np.arange(n * T).reshape(n, T)
+
+        self.trails = pv.PolyData()
+        self.trails.SetPoints(self.trail_points)
+        self.trails.lines = cells.ravel()
+        # Độ "mới" dọc vệt: đầu vệt sáng, đuôi mờ dần
+        self.trails["age"] = np.tile(np.linspace(0, 1, T, dtype=np.float32), n)
+
+        if self.trail_actor is not None:
+            self.plotter.remove_actor(self.trail_actor)
+        self.trail_actor = self.plotter.add_mesh(
+            self.trails,
+            scalars="age",
+            cmap="autumn",
+            show_scalar_bar=False,
+            line_width=1.5,
+            reset_camera=False,
         )
 
-        pts = self.grid.points
-        m = np.array([0, self.B, 0])
+    def clear_particles(self):
+        if self.trail_actor is not None:
+            self.plotter.remove_actor(self.trail_actor)
+        self.particles = None
+        self.trail_actor = None
+
+    def update_particles(self):
+        if self.particles is None:
+            return
+
+        # Đổi hình học: chờ thanh trượt dừng rồi mới xin lưới mới; trong lúc
+        # chờ hạt vẫn chạy trên lưới cũ
+        key = (self.scene, self.magnet_len, self.gap)
+        if key != self.field_grid_key and time.perf_counter() - self.last_request >= 0.3:
+            self.request_grid(key)
+
+        self.particles.step(1 / 60)
+        self.trail_points.Modified()
+        self.trails.Modified()
+
+    # ================= PROBE & SLICE =================
+    # Chỉ tính trường tại điểm dò và các điểm của mặt cắt. Mặt cắt tính trên
+    # luồng phụ, lưu theo vị trí nên kéo về chỗ cũ không tính lại.
+
+    def set_probe(self, on):
+        if on:
+            self.plotter.add_sphere_widget(
+                self.move_probe, center=self.probe_pos, radius=0.12, color="#ffe14d"
+            )
+            self.move_probe(self.probe_pos)
+        else:
+            self.plotter.clear_sphere_widgets()
+            if self.probe_actor is not None:
+                self.probe_actor.SetVisibility(False)
+            self.lbl_probe.setText("")
+
+    def move_probe(self, center):
+        self.probe_pos = tuple(center)
+        B, mag = probe(self.current_sources(), center, self.B)
+        direction = B / (mag + 1e-12)
+
+        arrow = pv.Arrow(start=center, direction=direction, scale=0.8)
+        if self.probe_actor is None:
+            self.probe_actor = self.plotter.add_mesh(arrow, color="#ffe14d", reset_camera=False)
+        else:
+            self.probe_actor.mapper.dataset.deep_copy(arrow)
+        self.probe_actor.SetVisibility(True)
+
+        self.lbl_probe.setText(
+            f"|B| = {mag:.3g}\n"
+            f"HƯỚNG ({direction[0]:.2f}, {direction[1]:.2f}, {direction[2]:.2f})"
+        )
 
-        self.grid["B"] = self.dipole_field(pts, m)
+    def set_slice(self, on):
+        if on:
+            self.plotter.add_plane_widget(
+                self.move_slice,
+                normal=self.slice_normal,
+                origin=self.slice_origin,
+                bounds=(-5, 5, -5, 5, -5, 5),
+                interaction_event="always",
+            )
+            self.move_slice(self.slice_normal, self.slice_origin)
+        else:
+            self.plotter.clear_plane_widgets()
+            self.slice_worker.cancel()
+            if self.slice_actor is not None:
+                self.slice_actor.SetVisibility(False)
+
+    def move_slice(self, normal, origin):
+        self.slice_normal, self.slice_origin = tuple(normal), tuple(origin)
+        self.slice_worker.submit({
+            "sources": self.current_sources(),
+            "geometry": self.sources_key,
+            "origin": self.slice_origin,
+            "normal": self.slice_normal,
+        })
+
+    def show_slice(self, sample):
+        pts, _, logB = sample
+        if self.slice_mesh is None:
+            res = int(round(np.sqrt(len(pts))))
+            self.slice_mesh = pv.PolyData(pts.copy(), faces=plane_faces(res))
+            self.slice_mesh["logB_unit"] = logB
+            self.slice_actor = self.plotter.add_mesh(
+                self.slice_mesh,
+                scalars="logB_unit",
+                cmap="cool",
+                clim=strength_range(self.B),
+                show_scalar_bar=False,
+                opacity=0.85,
+                reset_camera=False,
+            )
+        else:
+            # Cùng số điểm, cùng ô → chỉ ghi đè tọa độ và giá trị
+            self.slice_mesh.points[:] = pts
+            self.slice_mesh["logB_unit"][:] = logB
+            self.slice_mesh.Modified()
+        self.slice_actor.SetVisibility(True)
+        self.plotter.render()
 
-        if self.stream_actor:
-            self.plotter.remove_actor(self.stream_actor)
+    # ================= UPDATE (NẶNG → LUỒNG PHỤ) =================
 
-        stream = self.grid.streamlines(
-            vectors="B",
-            n_points=self.stream_count,
-            max_steps=300,
-            terminal_speed=5e-2,
-            initial_step_length=0.3
-        )
-
-        self.stream_actor = self.plotter.add_mesh(
-            stream.tube(radius=self.tube_radius),
-            color="#00f7ff",
-            opacity=self.opacity,
-            smooth_shading=True
-        )
+    def update_field(self):
+        # Gửi yêu cầu mới, yêu cầu cũ đang tính sẽ bị hủy
+        self.worker.submit({
+            "grid_n": self.grid_n,
+            "stream_count": self.stream_count,
+            "magnet_len": self.magnet_len,
+            "gap": self.gap,
+            "scene": self.scene,
+            "tracer": self.tracer,
+        })
+        self.lbl_status.setText("ĐANG TÍNH TRƯỜNG...")
+
+    def poll_result(self):
+        sample = self.slice_worker.take()
+        if sample is not None and self.cb_slice.isChecked():
+            self.show_slice(sample)
+
+        grid = self.grid_worker.take()
+        if grid is not None:
+            # Giữ cả lưới đã lỗi thời: quay lại đúng hình học đó thì dùng ngay
+            self.field_grid, self.field_grid_key = grid["grid"], grid["key"]
+            # Chưa có hạt mà lưới đã lỗi thời → make_particles xin lưới cho
+            # hình học hiện tại (update_particles chỉ xin khi đã có hạt)
+            key = (self.scene, self.magnet_len, self.gap)
+            if self.cb_particles.isChecked() and (self.particles is None or grid["key"] == key):
+                self.make_particles()
+
+        # Trường cũ vẫn hiển thị cho tới khi có kết quả mới
+        result = self.worker.take()
+        if result is not None:
+            self.show_stream(result["stream"])
+
+        if (grid is not None or result is not None) and not (
+            self.worker.busy or self.grid_worker.busy
+        ):
+            self.lbl_status.setText("")
+
+    def show_atlas(self):
+        # Hiện mục atlas gần nhất; True nếu đúng nấc hiện tại
+        if self.atlas is None or self.tracer == "grid":
+            return False
+        hit = self.atlas.lookup(self.scene, self.magnet_len, self.gap)
+        if hit is None:
+            return False
+        stream = atlas_streamlines(self.atlas, hit[0], self.stream_count)
+        if stream is None:
+            return False
+
+        self.show_stream(stream)
+        return hit[1]
+
+    def stop(self):
+        self.update_timer.stop()
+        self.poll_timer.stop()
+        self.worker.stop()
+        self.grid_worker.stop()
+        self.slice_worker.stop()
+        if self.atlas is not None:
+            self.atlas.close()
 
     # ================= SETTERS =================
     # ---- NẶNG → debounce ----
 
-    def set_B(self, v):
-        self.B = v
+    def set_scene(self, index):
+        self.scene = self.cb_scene.itemData(index)
+        self.request_update()
+
+    def set_tracer(self, on):
+        self.tracer = "grid" if on else "rk45"
         self.request_update()
 
     def set_grid(self, v):
@@ -135,19 +466,45 @@ class MagneticSim:
 
     # ---- NHẸ → realtime ----
 
+    def set_particles(self, on):
+        if on:
+            self.make_particles()
+        else:
+            self.clear_particles()
+
+    def set_particle_count(self, v):
+        self.particle_count = v * 1000
+        if self.particles is not None:
+            self.make_particles()
+
+    def set_q_m(self, v):
+        self.q_m = v
+        if self.particles is not None:
+            self.particles.q_m = v
+
+    def set_particle_speed(self, v):
+        self.particle_speed = v / 10
+        if self.particles is not None:
+            self.particles.set_speed(self.particle_speed)
+
+    def set_B(self, v):
+        # Trường tỉ lệ tuyến tính với B → chỉ dịch thang màu
+        self.B = v
+        if self.particles is not None:
+            self.particles.strength = v
+        self.stream_mapper.SetScalarRange(*strength_range(self.B))
+        if self.slice_actor is not None:
+            self.slice_actor.mapper.SetScalarRange(*strength_range(self.B))
+        if self.cb_probe.isChecked():
+            self.move_probe(self.probe_pos)
+        self.plotter.render()
+
     def set_radius(self, v):
         self.tube_radius = v / 1000
-        if self.stream_actor:
-            self.stream_actor.mapper.SetScalarRange(0, 1)
-            self.stream_actor.GetMapper().GetInput().GetPointData()
-            self.stream_actor = self.plotter.add_mesh(
-                self.stream_actor.mapper.GetInput().tube(radius=self.tube_radius),
-                color="#00f7ff",
-                opacity=self.opacity,
-                smooth_shading=True
-            )
+        self.tube_filter.SetRadius(self.tube_radius)
+        self.plotter.render()
 
     def set_opacity(self, v):
         self.opacity = v / 100
-        if self.stream_actor:
-            self.stream_actor.GetProperty().SetOpacity(self.opacity)
+        self.stream_actor.GetProperty().SetOpacity(self.opacity)
+        self.plotter.render()
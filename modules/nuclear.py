@@ -1,9 +1,24 @@
 import pyvista as pv
 import numpy as np
 from pyvistaqt import BackgroundPlotter
-from PyQt6.QtWidgets import QLabel, QSlider, QFrame, QVBoxLayout
+from PyQt6.QtWidgets import (
+    QLabel, QSlider, QFrame, QVBoxLayout, QPushButton, QFileDialog, QComboBox,
+    QCheckBox, QMessageBox
+)
 from PyQt6.QtCore import Qt
 
+from core.decay import DecayQueue, reserve
+from core.decay_chain import (
+    CHAINS, AggregateDecay, BatemanCohorts, DecayChain, bateman_matrix, chain_nuclides
+)
+from core.gas_observables import RingBuffer
+from core.gamma_rays import GammaRayBuffer, random_directions
+from core.geiger import SHAPES, GeigerCounter
+from core.recorder import TrajectoryRecorder, open_trajectory
+
+
+SPECIES_COLORS = ["#ef4444", "#f59e0b", "#84cc16", "#22d3ee", "#a78bfa", "#f472b6", "#e5e7eb"]
+
 
 class NuclearSim:
     def __init__(self, display_layout, param_layout):
@@ -25,7 +40,31 @@ class NuclearSim:
 
         self.point_size = 10
 
+        # None = một loại hạt nhân với λ từ thanh trượt
+        self.chain_key = None
+        self.chain = None
+        self.chart = None
+
+        # None = mô phỏng từng hạt; 10^6–10^8 = chỉ đếm số hạt mỗi loại,
+        # vẽ một tập con đại diện n_shown điểm
+        self.population = None
+        self.n_shown = 2000
+        self.aggregate = None
+
+        # Máy đếm Geiger: đầu dò trên trục +x
+        self.show_geiger = False
+        self.geiger_shape = "sphere"
+        self.geiger_distance = 4.0
+        self.geiger_size = 0.8
+        self.geiger_actor = None
+
+        self.recorder = None
+        self.replay = None
+
         # ===== INIT =====
+        self.geiger = GeigerCounter(self.geiger_shape, self.geiger_distance, self.geiger_size)
+        self.gammas = GammaRayBuffer()
+        self.make_gamma_mesh()
         self.init_atoms()
 
         # ===== UI =====
@@ -38,15 +77,94 @@ class NuclearSim:
 
     def init_atoms(self):
         self.time = 0.0
-        self.pos = np.random.normal(0, self.sample_radius, (self.n_atoms, 3))
-        self.active = np.ones(self.n_atoms, dtype=np.float32)
+        self.n_total = self.n_atoms if self.population is None else self.population
+        n_points = self.n_atoms if self.population is None else self.n_shown
+        self.applied_radius = self.sample_radius
+        self.sample_lambda = self.lambda_val
+        # Bộ đệm điểm / vô hướng có dự trữ: VTK bọc thẳng n phần tử đầu
+        self.pos_buf = np.random.normal(0, self.sample_radius, (n_points, 3)).astype(np.float32)
+        self.active_buf = np.ones(n_points, dtype=np.float32)
+        self.vert_buf = np.zeros(0, dtype=np.int64)
+        self.chain = None
+        self.queue = None
+        self.aggregate = None
+
+        if self.population is not None:
+            nuclides = chain_nuclides(self.chain_key, self.lambda_val)
+            self.aggregate = AggregateDecay(nuclides, self.population, self.n_shown)
+            names = self.aggregate.names
+            A = bateman_matrix(nuclides)
+        elif self.chain_key is None:
+            self.queue = DecayQueue(np.random.exponential(1 / self.lambda_val, self.n_atoms))
+            names = ["Mẹ"]
+            A = np.array([[-self.lambda_val]])
+        else:
+            nuclides = chain_nuclides(self.chain_key)
+            self.chain = DecayChain(nuclides, self.n_atoms)
+            names = self.chain.names
+            A = bateman_matrix(nuclides)
+
+        # Màu theo vị trí trong chuỗi: mẹ = 1 (đỏ đậm) → bền = 0
+        S = len(names)
+        self.levels = (1 - np.arange(S) / max(S - 1, 1)).astype(np.float32)
+
+        self.make_mesh(self.pos_buf, self.active_buf)
+        self.bind_points(n_points)
+        self.make_chart(names, A)
+
+        # Bản ghi có N cố định → dừng ghi khi đổi N
+        if self.recorder is not None:
+            self.btn_record.setChecked(False)
+
+        self.gammas.clear()
+        self.geiger.reset(self.time)
+
+    def resize_sample(self, n):
+        # Thêm / bớt hạt ở cuối mẫu, giữ nguyên trạng thái phân rã của các hạt
+        # còn lại; mesh và actor giữ nguyên, chỉ bọc lại n điểm đầu bộ đệm
+        old = len(self.pos)
+        if n < old:
+            if self.queue is not None:
+                self.queue.resize(n)
+            else:
+                self.chain.resize(n, self.time)
+        else:
+            self.pos_buf = reserve(self.pos_buf, n)
+            self.active_buf = reserve(self.active_buf, n)
+            self.pos_buf[old:n] = np.random.normal(0, self.sample_radius, (n - old, 3))
+            self.active_buf[old:n] = 1.0
+            if self.queue is not None:
+                times = self.time + np.random.exponential(1 / self.sample_lambda, n - old)
+                self.queue.resize(n, times)
+            else:
+                self.chain.resize(n, self.time)
 
-        self.decay_time = np.random.exponential(
-            1 / self.lambda_val, self.n_atoms
-        )
+        self.reference.resize(n)
+        self.n_total = n
+        self.bind_points(n)
 
-        self.mesh = pv.PolyData(self.pos)
-        self.mesh["active"] = self.active
+        if self.recorder is not None:
+            self.btn_record.setChecked(False)
+
+    def bind_points(self, n):
+        if len(self.vert_buf) < 2 * n:
+            k = np.arange(len(self.pos_buf))
+            self.vert_buf = np.column_stack([np.ones_like(k), k]).ravel()
+
+        self.mesh.SetPoints(pv.vtk_points(self.pos_buf[:n], deep=False))
+        self.mesh.verts = self.vert_buf[:2 * n]
+        self.mesh.point_data.set_array(self.active_buf[:n], "active")
+        self.mesh.set_active_scalars("active")
+        self.bind_state()
+
+    def rescale_sample(self, radius):
+        # Mẫu Gauss: đổi bán kính = co giãn vị trí tại chỗ
+        self.pos[:] = self.pos * (radius / self.applied_radius)
+        self.applied_radius = radius
+
+    def make_mesh(self, pos, active):
+        self.mesh = pv.PolyData(pos)
+        self.mesh["active"] = active
 
         if hasattr(self, "actor"):
             self.plotter.remove_actor(self.actor)
@@ -60,7 +178,137 @@ class NuclearSim:
             point_size=self.point_size,
         )
 
-        self.rays = []
+    def make_chart(self, names, A):
+        # Số hạt từng loại (ngẫu nhiên, nét liền) và Bateman (nét đứt),
+        # tính theo nhóm hạt cùng thời điểm sinh → đúng cả khi đổi N
+        self.reference = BatemanCohorts(A, self.n_total)
+        self.hist_t = RingBuffer(400)
+        self.hist_n = [RingBuffer(400) for _ in names]
+        self.hist_exact = [RingBuffer(400) for _ in names]
+
+        if self.chart is not None:
+            self.plotter.remove_chart(self.chart)
+
+        self.chart = pv.Chart2D(size=(0.4, 0.32), loc=(0.58, 0.02))
+        self.chart.background_color = (0.0, 0.0, 0.0, 0.4)
+        self.chart.x_label = "t"
+        self.chart.y_label = "N / N0"
+        self.chart.y_range = [0, 1.02]
+
+        self.plots_n, self.plots_exact = [], []
+        for k, name in enumerate(names):
+            color = SPECIES_COLORS[k % len(SPECIES_COLORS)]
+            self.plots_n.append(self.chart.line([0, 0], [1, 1], color=color, width=2, label=name))
+            self.plots_exact.append(self.chart.line([0, 0], [1, 1], color=color, width=1, style="--"))
+        self.plotter.add_chart(self.chart)
+
+    def update_chart(self, counts):
+        self.reference.advance(self.dt)
+        expected = self.reference.expected()
+
+        self.hist_t.push(self.time)
+        for k in range(len(self.hist_n)):
+            self.hist_n[k].push(counts[k] / self.n_total)
+            self.hist_exact[k].push(expected[k] / self.n_total)
+
+        t = self.hist_t.values()
+        if len(t) < 2:
+            return
+        for k in range(len(self.hist_n)):
+            self.plots_n[k].update(t, self.hist_n[k].values())
+            self.plots_exact[k].update(t, self.hist_exact[k].values())
+        self.chart.x_range = [t[0], t[-1]]
+
+    def bind_state(self):
+        # pos/active là view float32 vào chính bộ nhớ điểm/vô hướng của VTK:
+        # ghi tại chỗ, pyvista tự đánh dấu Modified()
+        self.pos = self.mesh.points
+        self.active = self.mesh.point_data["active"]
+
+    def make_gamma_mesh(self):
+        # Một lưới line cho mọi tia gamma, bọc thẳng bộ đệm float32
+        self.gamma_points = pv.vtk_points(self.gammas.points, deep=False)
+        self.gamma_mesh = pv.PolyData()
+        self.gamma_mesh.SetPoints(self.gamma_points)
+        self.gamma_mesh["ttl"] = self.gammas.ttl
+        self.gamma_ttl_array = self.gamma_mesh.point_data["ttl"]
+
+        if hasattr(self, "gamma_actor"):
+            self.plotter.remove_actor(self.gamma_actor)
+
+        # Tia mờ dần theo TTL còn lại
+        self.gamma_actor = self.plotter.add_mesh(
+            self.gamma_mesh,
+            scalars="ttl",
+            clim=[0, self.gamma_ttl],
+            cmap="Blues",
+            line_width=2,
+            show_scalar_bar=False,
+        )
+
+    def update_gamma_mesh(self):
+        self.gamma_points.Modified()
+        self.gamma_ttl_array[:] = self.gammas.ttl
+        self.gamma_mesh.lines = self.gammas.lines()
+        self.gamma_actor.visibility = self.gammas.count > 0
+        self.gamma_actor.mapper.scalar_range = (0, max(self.gamma_ttl, 1))
+
+    # ================= GEIGER =================
+
+    def make_geiger(self):
+        # Vỏ đầu dò + 2 biểu đồ: tốc độ đếm theo thời gian, hiệu suất theo d
+        s, d = self.geiger_size, self.geiger_distance
+        if self.geiger_shape == "sphere":
+            body = pv.Sphere(radius=s, center=(d, 0, 0))
+        else:
+            body = pv.Box(bounds=(d - 0.05, d + 0.05, -s, s, -s, s))
+
+        if self.geiger_actor is not None:
+            self.plotter.remove_actor(self.geiger_actor)
+        self.geiger_actor = self.plotter.add_mesh(body, color="#facc15", opacity=0.35)
+        self.geiger_actor.visibility = self.show_geiger
+
+        if not hasattr(self, "rate_chart"):
+            chart = pv.Chart2D(size=(0.36, 0.3), loc=(0.02, 0.02))
+            chart.background_color = (0.0, 0.0, 0.0, 0.4)
+            chart.x_label = "t"
+            chart.y_label = "đếm / t"
+            self.rate_plot = chart.bar([0.0], [0.0], color="#facc15")
+            self.rate_chart = chart
+
+            chart = pv.Chart2D(size=(0.36, 0.3), loc=(0.02, 0.36))
+            chart.background_color = (0.0, 0.0, 0.0, 0.4)
+            chart.x_label = "d"
+            chart.y_label = "đếm / phát"
+            self.scan_plot = chart.scatter([0.0], [0.0], color="#facc15", size=8)
+            self.scan_exact = chart.line([0.0], [0.0], color="#e5e7eb", width=1, style="--")
+            self.scan_chart = chart
+
+            self.plotter.add_chart(self.rate_chart, self.scan_chart)
+
+        self.rate_chart.visible = self.show_geiger
+        self.scan_chart.visible = self.show_geiger
+
+    def update_geiger(self):
+        t, rate = self.geiger.bin_times.values(), self.geiger.rates.values()
+        if len(t):
+            self.rate_plot.update(t, rate)
+            self.rate_chart.x_range = [t[0] - self.geiger.bin_width, t[-1]]
+            self.rate_chart.y_range = [0, max(rate.max(), 1e-9) * 1.1]
+
+        d, eff = self.geiger.efficiency_curve()
+        if len(d):
+            grid = np.linspace(1.0, 10.0, 60)
+            exact = self.geiger.expected(grid)
+            self.scan_plot.update(d, eff)
+            self.scan_exact.update(grid, exact)
+            self.scan_chart.x_range = [0, 10]
+            self.scan_chart.y_range = [0, max(eff.max(), exact.max()) * 1.1]
+
+        self.lbl_geiger.setText(
+            f"TỐC ĐỘ ĐẾM: {self.geiger.rates.last():.4g} / đơn vị t\n"
+            f"d = {self.geiger_distance:.1f}  (Ω/4π ≈ {self.geiger.expected(self.geiger_distance):.4f})"
+        )
 
     # ================= UI =================
 
@@ -86,7 +334,23 @@ class NuclearSim:
         # ===== NUCLEAR =====
         sec = self.section(layout, "PHÂN RÃ HẠT NHÂN")
 
-        self.s_n = self.slider(sec, "SỐ HẠT NHÂN (N)", 100, 1500, self.n_atoms)
+        sec.addWidget(QLabel("CHUỖI PHÂN RÃ"))
+        self.cb_chain = QComboBox()
+        self.cb_chain.addItem("MỘT LOẠI (λ)", None)
+        for key, chain in CHAINS.items():
+            self.cb_chain.addItem(chain["name"], key)
+        self.cb_chain.currentIndexChanged.connect(self.set_chain)
+        sec.addWidget(self.cb_chain)
+
+        sec.addWidget(QLabel("CHẾ ĐỘ MÔ PHỎNG"))
+        self.cb_population = QComboBox()
+        self.cb_population.addItem("TỪNG HẠT (N)", None)
+        for k in (6, 7, 8):
+            self.cb_population.addItem(f"THỐNG KÊ 10^{k} HẠT", 10**k)
+        self.cb_population.currentIndexChanged.connect(self.set_population)
+        sec.addWidget(self.cb_population)
+
+        self.s_n = self.slider(sec, "SỐ HẠT NHÂN (N)", 100, 30000, self.n_atoms)
         self.s_lambda = self.slider(sec, "HẰNG SỐ PHÂN RÃ (λ)", 1, 100, 20)
         self.s_dt = self.slider(sec, "BƯỚC THỜI GIAN (dt)", 1, 200, 50)
 
@@ -94,21 +358,138 @@ class NuclearSim:
         self.lbl_alive.setObjectName("Pressure")
         sec.addWidget(self.lbl_alive)
 
+        self.lbl_chain = QLabel("")
+        sec.addWidget(self.lbl_chain)
+
         # ===== GAMMA =====
         sec = self.section(layout, "TIA GAMMA")
 
         self.s_gamma_len = self.slider(sec, "ĐỘ DÀI TIA", 10, 60, 25)
         self.s_gamma_ttl = self.slider(sec, "THỜI GIAN TỒN TẠI", 1, 20, self.gamma_ttl)
 
+        # ===== GEIGER =====
+        sec = self.section(layout, "MÁY ĐẾM GEIGER")
+
+        self.cb_geiger = QCheckBox("BẬT ĐẦU DÒ")
+        self.cb_geiger.toggled.connect(self.set_geiger)
+        sec.addWidget(self.cb_geiger)
+
+        self.cb_geiger_shape = QComboBox()
+        for key, name in SHAPES.items():
+            self.cb_geiger_shape.addItem(name, key)
+        sec.addWidget(self.cb_geiger_shape)
+
+        self.s_geiger_d = self.slider(sec, "KHOẢNG CÁCH (d)", 15, 100, int(self.geiger_distance * 10))
+        self.s_geiger_size = self.slider(sec, "KÍCH THƯỚC ĐẦU DÒ", 2, 15, int(self.geiger_size * 10))
+
+        self.lbl_geiger = QLabel("")
+        sec.addWidget(self.lbl_geiger)
+
         # ===== DISPLAY =====
         sec = self.section(layout, "HIỂN THỊ")
 
         self.s_size = self.slider(sec, "KÍCH THƯỚC HẠT", 4, 20, self.point_size)
         self.s_radius = self.slider(sec, "BÁN KÍNH MẪU", 5, 30, int(self.sample_radius * 10))
 
+        # ===== GHI / PHÁT LẠI =====
+        sec = self.section(layout, "GHI / PHÁT LẠI")
+
+        self.btn_record = QPushButton("GHI HÌNH")
+        self.btn_record.setCheckable(True)
+        self.btn_record.toggled.connect(self.toggle_record)
+        sec.addWidget(self.btn_record)
+
+        self.btn_replay = QPushButton("PHÁT LẠI")
+        self.btn_replay.setCheckable(True)
+        self.btn_replay.toggled.connect(self.toggle_replay)
+        sec.addWidget(self.btn_replay)
+
+        self.s_frame = self.slider(sec, "KHUNG HÌNH", 0, 0, 0)
+
+    def set_chain(self, index):
+        self.chain_key = self.cb_chain.itemData(index)
+        self.lbl_chain.setText("")
+        self.init_atoms()
+
+    def set_geiger(self, on):
+        self.show_geiger = on
+        self.make_geiger()
+        if on:
+            # Ô thời gian bắt đầu từ lúc bật, không lấp các ô đã trôi qua
+            self.geiger.reset(self.time)
+        else:
+            self.lbl_geiger.setText("")
+
+    def set_population(self, index):
+        self.population = self.cb_population.itemData(index)
+        self.lbl_chain.setText("")
+        self.init_atoms()
+
+    # ================= GHI / PHÁT LẠI =================
+
+    def toggle_record(self, on):
+        if on:
+            path, _ = QFileDialog.getSaveFileName(
+                None, "Ghi quỹ đạo", "hat_nhan.trj", "Quỹ đạo (*.trj)"
+            )
+            if not path:
+                self.btn_record.setChecked(False)
+                return
+            self.recorder = TrajectoryRecorder(path, len(self.pos), scalars=("active",))
+        elif self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def toggle_replay(self, on):
+        if on:
+            path, _ = QFileDialog.getOpenFileName(
+                None, "Mở bản ghi", "", "Quỹ đạo (*.trj)"
+            )
+            if not path:
+                self.btn_replay.setChecked(False)
+                return
+            try:
+                self.replay = open_trajectory(path, "active")
+            except ValueError as e:
+                QMessageBox.warning(None, "Không mở được bản ghi", str(e))
+                self.btn_replay.setChecked(False)
+                return
+            self.s_frame.setRange(0, len(self.replay) - 1)
+            self.s_frame.setValue(0)
+            _, pos, scalars = self.replay.frame(0)
+            self.make_mesh(pos, scalars["active"])
+        elif self.replay is not None:
+            self.replay.close()
+            self.replay = None
+            self.s_frame.setRange(0, 0)
+            n = len(self.pos)
+            self.make_mesh(self.pos_buf[:n], self.active_buf[:n])
+            self.bind_points(n)
+
+    def update_replay(self):
+        # Tự chạy tiếp, trừ khi người dùng đang kéo thanh tua
+        k = self.s_frame.value()
+        if not self.s_frame.isSliderDown():
+            k = (k + 1) % len(self.replay)
+            self.s_frame.setValue(k)
+
+        _, pos, scalars = self.replay.frame(k)
+        self.mesh.points = pos
+        self.mesh["active"] = scalars["active"]
+        self.actor.visibility = True
+        self.lbl_alive.setText(f"CÒN LẠI: {np.mean(scalars['active']) * 100:.1f}%")
+
+    def stop(self):
+        if self.recorder is not None:
+            self.recorder.close()
+
     # ================= UPDATE =================
 
     def update(self):
+        if self.replay is not None:
+            self.update_replay()
+            return
+
         # ===== PARAM UPDATE =====
         self.n_atoms = self.s_n.value()
         self.lambda_val = max(self.s_lambda.value() / 400, 0.001)
@@ -118,46 +499,81 @@ class NuclearSim:
         self.point_size = self.s_size.value()
         self.sample_radius = self.s_radius.value() / 10
 
-        if len(self.active) != self.n_atoms:
+        # Mẫu một loại: hạt đã rút thời điểm phân rã theo λ cũ → khởi tạo lại
+        if self.chain_key is None and self.lambda_val != self.sample_lambda:
             self.init_atoms()
             return
+        if self.population is None and len(self.active) != self.n_atoms:
+            self.resize_sample(self.n_atoms)
+        if self.sample_radius != self.applied_radius:
+            self.rescale_sample(self.sample_radius)
+
+        geometry = (
+            self.cb_geiger_shape.currentData(),
+            self.s_geiger_d.value() / 10,
+            self.s_geiger_size.value() / 10,
+        )
+        if geometry != (self.geiger_shape, self.geiger_distance, self.geiger_size):
+            self.geiger_shape, self.geiger_distance, self.geiger_size = geometry
+            self.geiger.shape, self.geiger.distance, self.geiger.size = geometry
+            if self.show_geiger:
+                self.make_geiger()
 
         self.actor.prop.point_size = self.point_size
 
         self.time += self.dt
 
         # ===== DECAY =====
-        decayed = (self.active > 0) & (self.time >= self.decay_time)
-
-        for idx in np.where(decayed)[0]:
-            self.active[idx] = 0.0
-
-            if self.show_gamma:
-                start = self.pos[idx]
-                direction = np.random.randn(3)
-                direction /= np.linalg.norm(direction)
-                end = start + direction * self.gamma_length
-
-                ray = pv.Line(start, end)
-                actor = self.plotter.add_mesh(
-                    ray, color="#38bdf8", line_width=2
-                )
-                self.rays.append([actor, self.gamma_ttl])
-
-        self.mesh["active"] = self.active
-
-        # ===== GAMMA TTL =====
-        alive = []
-        for actor, ttl in self.rays:
-            if ttl > 0:
-                alive.append([actor, ttl - 1])
-            else:
-                self.plotter.remove_actor(actor)
-        self.rays = alive
+        if self.aggregate is not None:
+            # Quần thể thật đi theo số đếm; tập con vẽ chỉ đổi các điểm
+            # cần để khớp tỉ lệ mới
+            decayed = self.aggregate.advance(self.dt)
+            self.active[decayed] = self.levels[self.aggregate.species[decayed]]
+            counts = self.aggregate.counts
+        elif self.queue is not None:
+            # Chỉ lấy các hạt vừa tới hạn từ hàng đợi đã sắp xếp
+            decayed = self.queue.advance(self.time)
+            self.active[decayed] = 0.0
+            counts = [self.queue.alive]
+        else:
+            # Cả lô chuyển tiếp của nhịp; hạt có thể đổi loại nhiều lần
+            decayed, _, _ = self.chain.advance(self.time)
+            self.active[decayed] = self.levels[self.chain.species[decayed]]
+            counts = self.chain.counts
+
+        if self.recorder is not None:
+            self.recorder.append(self.time, self.pos, active=self.active)
 
-        # ===== STATS =====
-        alive_ratio = np.mean(self.active) * 100
-        self.lbl_alive.setText(f"CÒN LẠI: {alive_ratio:.1f}%")
+        # ===== GAMMA =====
+        # Tia cũ giảm TTL trước, tia mới phát sau → sống đủ gamma_ttl + 1 nhịp
+        starts = self.pos[decayed]
+        dirs = random_directions(len(starts))
+        self.gammas.tick()
+        if self.show_gamma and self.gammas.emit(starts, dirs, self.gamma_length, self.gamma_ttl):
+            self.make_gamma_mesh()
+        self.update_gamma_mesh()
+
+        # ===== GEIGER =====
+        # Cùng lô tia vừa phát; mỗi điểm vẽ đại diện n_total / số điểm hạt thật
+        if self.show_geiger:
+            self.geiger.record(self.time, starts, dirs, weight=self.n_total / len(self.pos))
+            self.update_geiger()
 
-        if not np.any(self.active):
-            self.actor.visibility = False
+        # ===== STATS =====
+        alive_ratio = counts[0] / self.n_total * 100
+        self.lbl_alive.setText(f"CÒN LẠI: {alive_ratio:.3f}%")
+        self.update_chart(counts)
+
+        engine = self.chain if self.chain is not None else self.aggregate
+        if engine is not None:
+            n_alpha, n_beta = engine.emissions()
+            text = (
+                "\n".join(f"{name}: {c}" for name, c in zip(engine.names, counts))
+                + f"\nα: {n_alpha}  β: {n_beta} / nhịp"
+            )
+            if engine is self.aggregate:
+                text += f"\nMỖI ĐIỂM ≈ {self.n_total // self.n_shown} HẠT"
+            self.lbl_chain.setText(text)
+        else:
+            # Thêm hạt sau khi mẫu đã phân rã hết → hiện lại
+            self.actor.visibility = self.queue.alive > 0
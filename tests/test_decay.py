@@ -0,0 +1,77 @@
+import numpy as np
+
+from core.decay import DecayQueue
+from core.decay_chain import BatemanCohorts
+
+
+def test_queue_half_life():
+    lam = 0.05
+    n = 200000
+    queue = DecayQueue(np.random.default_rng(0).exponential(1 / lam, n))
+    t_half = np.log(2) / lam
+    queue.advance(t_half)
+    assert abs(queue.alive / n - 0.5) < 0.005
+
+
+def test_queue_returns_each_nucleus_once():
+    times = np.random.default_rng(1).exponential(10.0, 5000)
+    queue = DecayQueue(times)
+    seen = np.concatenate([queue.advance(t) for t in np.arange(0.5, 200, 0.5)])
+    assert len(np.unique(seen)) == len(seen)
+    assert np.all(times[seen] <= 200)
+    assert queue.alive == np.count_nonzero(times > 199.5)
+
+
+def resized_run(sizes, lam=0.05, dt=0.5, ticks=60, seed=0):
+    # Giống NuclearSim: đổi N rồi chạy ticks nhịp, tham chiếu theo nhóm
+    rng = np.random.default_rng(seed)
+    A = np.array([[-lam]])
+    queue = DecayQueue(rng.exponential(1 / lam, sizes[0]))
+    reference = BatemanCohorts(A, sizes[0])
+    t = 0.0
+    for n in sizes:
+        if n > queue.n:
+            queue.resize(n, t + rng.exponential(1 / lam, n - queue.n))
+        else:
+            queue.resize(n)
+        reference.resize(n)
+        for _ in range(ticks):
+            t += dt
+            queue.advance(t)
+            reference.advance(dt)
+    return queue, reference.expected()[0], t
+
+
+def test_resize_keeps_decay_state():
+    queue, _, t = resized_run([1000, 600, 900], ticks=20)
+    assert queue.n == 900
+    assert np.array_equal(np.sort(queue.order), np.arange(900))
+    assert np.all(np.diff(queue.times) >= 0)
+    assert queue.alive == np.count_nonzero(queue.times > t)
+
+
+def test_reference_drops_young_tail():
+    # N = 100 phân rã hết, tăng lên 30000 rồi giảm về 100: đuôi bị bỏ là
+    # nhóm hạt mới, tham chiếu phải về ~0 như số đếm thật
+    queue, expected, _ = resized_run([100, 30000, 100], ticks=400)
+    assert queue.alive <= 1
+    assert expected < 1.0
+
+
+def test_reference_tracks_mixed_ages():
+    queue, expected, _ = resized_run([20000, 60000, 35000, 50000], ticks=15)
+    assert abs(queue.alive - expected) < 4 * np.sqrt(expected)
+
+
+def test_reference_merges_same_tick_growth():
+    # Kéo thanh trượt N: nhiều lần thêm giữa hai nhịp gộp thành một nhóm,
+    # thêm sau một nhịp tạo nhóm mới
+    reference = BatemanCohorts(np.array([[-0.05]]), 100)
+    reference.advance(0.5)
+    for n in range(110, 400, 10):
+        reference.resize(n)
+    assert len(reference.cohorts) == 2
+    reference.advance(0.5)
+    reference.resize(500)
+    assert len(reference.cohorts) == 3
+    assert [c[:2] for c in reference.cohorts] == [[0, 100], [100, 390], [390, 500]]
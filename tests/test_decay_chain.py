@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from core.decay_chain import (
+    CHAINS, AggregateDecay, BatemanCohorts, DecayChain, bateman, bateman_matrix, chain_nuclides
+)
+
+
+def run(key, ticks=200):
+    nuclides = chain_nuclides(key)
+    chain = DecayChain(nuclides, 50000, seed=0)
+    big = AggregateDecay(nuclides, 10**8, seed=0)
+    t_end = 3 * np.log(2) / chain.lam[0]
+    dt = t_end / ticks
+    for k in range(1, ticks + 1):
+        chain.advance(k * dt)
+        big.advance(dt)
+    return chain, big, bateman(nuclides, 1.0, t_end)[0]
+
+
+@pytest.mark.parametrize("key", list(CHAINS))
+def test_stochastic_chain_matches_bateman(key):
+    chain, _, exact = run(key)
+    assert np.array_equal(np.bincount(chain.species, minlength=chain.n_species), chain.counts)
+    np.testing.assert_allclose(chain.counts / chain.n, exact, atol=0.01)
+
+
+@pytest.mark.parametrize("key", list(CHAINS))
+def test_aggregate_matches_bateman(key):
+    _, big, exact = run(key)
+    assert big.counts.sum() == big.n
+    np.testing.assert_allclose(big.counts / big.n, exact, atol=2e-4)
+
+
+# Rẽ nhánh với hai con sống lâu: điểm ở con thứ nhất dễ bị xếp sang con thứ hai
+FORK = [
+    ("A", 5.0, "beta", [("B", 0.5), ("C", 0.5)]),
+    ("B", 8.0, "alpha", [("D", 1.0)]),
+    ("C", 2.0, "beta", [("D", 1.0)]),
+    ("D", None, "stable", []),
+]
+
+
+@pytest.mark.parametrize("nuclides", [chain_nuclides(key) for key in CHAINS] + [FORK])
+def test_aggregate_subset_tracks_population(nuclides):
+    big = AggregateDecay(nuclides, 10**8, n_shown=2000, seed=1)
+    # reach[c, s]: từ s đi xuôi chuỗi tới được c (kể cả c = s)
+    reach = (bateman_matrix(nuclides) > 0) | np.eye(big.n_species, dtype=bool)
+    for _ in range(big.n_species):
+        reach = (reach.astype(int) @ reach.astype(int)) > 0
+
+    previous = big.species.copy()
+    dt = 3 * np.log(2) / big.lam[0] / 300
+    for _ in range(300):
+        big.advance(dt)
+        # Điểm vẽ chỉ đi xuôi chuỗi, không nhảy sang nhánh anh em
+        assert np.all(reach[big.species, previous])
+        previous = big.species.copy()
+    shown = np.bincount(big.species, minlength=big.n_species) / len(big.species)
+    np.testing.assert_allclose(shown, big.counts / big.n, atol=1e-3)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from core.field_model import build_scene
+from core.field_probe import SliceSampler, probe
+
+
+def test_slice_matches_point_probe():
+    sources = build_scene("bar", 0.9, 0.05)
+    slicer = SliceSampler(resolution=8)
+    pts, B, logB = slicer.sample(sources, "bar", (0.0, 0.5, 0.0), (0.0, 0.0, 1.0))
+    for k in (0, 17, 63):
+        np.testing.assert_allclose(B[k], probe(sources, pts[k])[0], rtol=1e-10)
+    np.testing.assert_allclose(logB, np.log10(np.linalg.norm(B, axis=1) + 1e-12))
+
+
+def test_cancelled_slice_is_not_cached():
+    sources = build_scene("bar", 0.9, 0.05)
+    slicer = SliceSampler(resolution=8)
+    params = {"sources": sources, "geometry": "bar", "origin": (0, 0, 0), "normal": (0, 0, 1)}
+    assert slicer(params, lambda: True) is None
+    assert len(slicer.entries) == 0
+    first = slicer(params, lambda: False)
+    assert slicer(params, lambda: False) is first
@@ -0,0 +1,41 @@
+import copy
+
+import numpy as np
+import pytest
+
+from core.gas_engine import GasEngine, GasState
+
+
+# Lưới ô phải cho đúng cùng kết quả với vòng lặp O(N²) gốc,
+# kể cả khi một hạt chạm nhiều hạt cùng lúc (giải tuần tự theo (i, j)).
+
+def compare(state):
+    twin = copy.deepcopy(state)
+    GasEngine(state, T=None).particle_collisions()
+    GasEngine(twin, T=None).particle_collisions_bruteforce()
+    return state.vel, twin.vel
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("n, radius", [(20, 0.2), (80, 0.1), (200, 0.06), (300, 0.02)])
+def test_cell_list_matches_bruteforce(seed, n, radius):
+    state = GasState(n, radius=radius, e=0.8, seed=seed)
+    fast, slow = compare(state)
+    np.testing.assert_allclose(fast, slow, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_cell_list_matches_bruteforce_mixture(seed):
+    state = GasState.mixture(
+        [(60, 1.0, 0.08, "#38bdf8"), (40, 4.0, 0.15, "#f97316")], e=0.9, seed=seed
+    )
+    fast, slow = compare(state)
+    np.testing.assert_allclose(fast, slow, rtol=1e-12, atol=1e-12)
+
+
+def test_cases_include_multi_body_contacts():
+    # Đảm bảo phép so sánh thật sự đi qua nhánh giải tuần tự
+    state = GasState(80, radius=0.1, seed=0)
+    r = state.pos[:, None] - state.pos[None]
+    touching = (np.linalg.norm(r, axis=2) < 0.2).sum(axis=1) - 1
+    assert np.any(touching >= 2)
@@ -0,0 +1,65 @@
+import numpy as np
+
+from core.gas_engine import GasState
+from core.gas_events import EventDrivenEngine
+
+
+def test_elastic_run_conserves_energy():
+    engine = EventDrivenEngine(GasState(200, radius=0.02, seed=0), T=None)
+    E0 = engine.kinetic_energy()
+    engine.step(50, 0.02)
+    assert engine.n_events > 0
+    assert abs(engine.kinetic_energy() - E0) / E0 < 1e-9
+
+
+def test_particles_stay_inside_box():
+    state = GasState(200, radius=0.02, seed=1)
+    engine = EventDrivenEngine(state, T=None)
+    engine.step(50, 0.02)
+    assert np.all(np.abs(state.pos) <= state.half_size + 1e-9)
+
+
+def test_event_limit_does_not_tunnel():
+    # Chạm max_events thì dừng ở sự kiện cuối, phần còn lại chạy ở bước sau
+    state = GasState(200, radius=0.03, seed=2)
+    engine = EventDrivenEngine(state, T=None, max_events=5)
+    E0 = engine.kinetic_energy()
+    lagged = False
+    for _ in range(40):
+        engine.step(1, 0.02)
+        lagged |= state.time < engine.clock
+        assert np.all(np.abs(state.pos) <= state.half_size + 1e-9)
+    assert lagged
+    assert abs(engine.kinetic_energy() - E0) / E0 < 1e-9
+
+
+def test_thermostat_rescales_pending_events():
+    # Đổi khóa heap tại chỗ phải cho cùng quỹ đạo với dựng lại hàng đợi
+    a = EventDrivenEngine(GasState(150, radius=0.03, e=0.9, seed=3), T=80)
+    b = EventDrivenEngine(GasState(150, radius=0.03, e=0.9, seed=3), T=80)
+    for _ in range(20):
+        a.step(1, 0.02)
+        b.advance_to(b.state.time + 0.02)
+        b.state.vel *= np.sqrt(b.T / b.temperature())
+        b.reset()
+    np.testing.assert_allclose(a.state.pos, b.state.pos, atol=1e-8)
+    assert abs(a.temperature() - 80) < 1e-6
+
+
+def test_neighbour_cells_do_not_miss_collisions():
+    # Lưới không chồng lấn ban đầu: bỏ sót một cặp thì hai hạt xuyên nhau
+    state = GasState(1000, radius=0.04, seed=4)
+    m = 10
+    g = (np.arange(m) + 0.5) / m * 1.9 - 0.95
+    state.pos[:] = np.stack(np.meshgrid(g, g, g), -1).reshape(-1, 3)
+    engine = EventDrivenEngine(state, T=None)
+    assert engine.nc >= 3
+    assert len(engine.queue) < 8 * state.n
+
+    E0 = engine.kinetic_energy()
+    for _ in range(30):
+        engine.step(1, 0.01)
+        i, j = np.triu_indices(state.n, k=1)
+        gap = np.linalg.norm(state.pos[i] - state.pos[j], axis=1)
+        assert gap.min() > 2 * state.radius * (1 - 1e-9)
+    assert abs(engine.kinetic_energy() - E0) / E0 < 1e-9
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from core.geiger import SHAPES, GeigerCounter
+
+
+def directions(rng, k):
+    d = rng.normal(size=(k, 3))
+    return d / np.linalg.norm(d, axis=1)[:, None]
+
+
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_point_source_matches_solid_angle(shape):
+    rng = np.random.default_rng(0)
+    counter = GeigerCounter(shape)
+    for d in (2.0, 4.0, 8.0):
+        counter.distance = d
+        starts = np.zeros((400000, 3))
+        counter.record(0.0, starts, directions(rng, len(starts)))
+
+    d, eff = counter.efficiency_curve()
+    np.testing.assert_allclose(eff, counter.expected(d), rtol=0.08)
+
+
+def test_rate_histogram_bins():
+    counter = GeigerCounter("sphere", distance=0.0, size=1.0, bin_width=1.0)
+    # Gốc tia trong đầu dò → mọi tia đều đếm
+    starts = np.zeros((10, 3))
+    dirs = np.tile([1.0, 0.0, 0.0], (10, 1))
+    counter.record(0.5, starts, dirs)
+    counter.record(1.5, starts[:4], dirs[:4])
+    counter.record(2.5, starts[:0], dirs[:0])
+    np.testing.assert_array_equal(counter.rates.values(), [10.0, 4.0])
+    np.testing.assert_array_equal(counter.bin_times.values(), [1.0, 2.0])
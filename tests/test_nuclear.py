@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("pyvistaqt")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from modules.nuclear import NuclearSim
+
+
+@pytest.fixture
+def sim():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    sim = NuclearSim(QtWidgets.QVBoxLayout(), QtWidgets.QVBoxLayout())
+    yield sim
+    sim.plotter.close()
+    app.processEvents()
+
+
+def test_lambda_slider_restarts_single_sample(sim):
+    sim.update()
+    assert sim.time > 0
+
+    sim.s_lambda.setValue(sim.s_lambda.value() * 2)
+    sim.update()
+    assert sim.sample_lambda == sim.lambda_val
+    assert sim.time == 0.0
+
+    # Thời điểm phân rã rút theo λ mới: trung bình ≈ 1/λ
+    times = sim.queue.times
+    assert abs(times.mean() * sim.lambda_val - 1) < 5 / np.sqrt(len(times))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from core.recorder import TrajectoryRecorder, open_trajectory
+
+
+def record(path, scalar, frames=3, n=10):
+    rec = TrajectoryRecorder(str(path), n, scalars=(scalar,))
+    for k in range(frames):
+        rec.append(0.1 * k, np.full((n, 3), k, dtype=np.float32), **{scalar: np.ones(n)})
+    rec.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "khi.trj"
+    record(path, "speed")
+    reader = open_trajectory(str(path), "speed")
+    t, pos, scalars = reader.frame(2)
+    assert len(reader) == 3
+    assert t == pytest.approx(0.2)
+    assert np.all(pos == 2) and np.all(scalars["speed"] == 1)
+    reader.close()
+
+
+def test_empty_recording(tmp_path):
+    # Bấm ghi rồi dừng ngay
+    path = tmp_path / "rong.trj"
+    record(path, "speed", frames=0)
+    with pytest.raises(ValueError):
+        open_trajectory(str(path), "speed")
+
+
+def test_not_a_trajectory(tmp_path):
+    path = tmp_path / "ghi_chu.trj"
+    path.write_text("không phải bản ghi")
+    with pytest.raises(ValueError):
+        open_trajectory(str(path), "speed")
+
+
+def test_recording_from_other_sim(tmp_path):
+    # Bản ghi hạt nhân mở trong mô phỏng khí
+    path = tmp_path / "hat_nhan.trj"
+    record(path, "active")
+    with pytest.raises(ValueError, match="speed"):
+        open_trajectory(str(path), "speed")
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(ValueError):
+        open_trajectory(str(tmp_path / "khong_co.trj"), "speed")